@@ -1,4 +1,5 @@
 import asyncio
+import time
 from app.core.config import CONFIG
 from pydantic_ai import Agent
 from pydantic_ai.models.openai import OpenAIResponsesModel
@@ -6,66 +7,195 @@ from pydantic_ai.providers.ollama import OllamaProvider
 from pydantic_ai.models.openrouter import OpenRouterModel
 from pydantic_ai.providers.openrouter import OpenRouterProvider
 from pydantic_ai.exceptions import UnexpectedModelBehavior
+from pydantic_ai.messages import ModelMessage, ModelRequest, SystemPromptPart
 from pydantic import BaseModel 
 from typing import Union, Type, Optional
 from app.core.logging import logger
+from app.core.events import get_publisher
+from app.core.task_context import get_current_task
+from app.agents.cache import ResponseCache
+from app.agents.compaction import ToolOutputCompactor
+from app.agents.metered_model import MeteredModel
+from app.agents.resilient_model import ResilientModel
+from app.core.metrics import record_agent_run, observe_tool
 from pydantic_ai.models.openrouter import OpenRouterModelSettings
  
 class BaseAgent:
 
-    def __init__(self, name: str, model_name: str, system_prompt: str, tools: list = None, description: str = None):
+    def __init__(
+        self,
+        name: str,
+        model_name: str,
+        system_prompt: str,
+        tools: list = None,
+        description: str = None,
+        cache_config: dict = None,
+        fallback_models: list[str] = None,
+        resilience_config: dict = None,
+        prompt_cache_config: dict = None,
+        tool_output_config: dict = None,
+    ):
         self.name = name
         self.model_name = model_name
+        self.fallback_models = fallback_models or []
+        self.resilience_config = resilience_config or {}
+        self.prompt_cache_config = prompt_cache_config or {}
         self.system_prompt = system_prompt
         self.tools = tools
         self.description = description
+        self.cache = ResponseCache.from_config(self.name.lower().replace(' ', '_'), cache_config)
+        self.compactor = ToolOutputCompactor.from_config(self.name, tool_output_config)
         self.agent = self._setup_agent()
         self.a2a = self.agent.to_a2a()
 
 
-    def _setup_agent(self) -> Agent:
+    def _prompt_cache_settings(self) -> dict:
+        """
+        OpenRouter cache_control breakpoints after the stable prefix: system prompt and tool schemas.
+
+        Only providers with explicit prompt caching (Anthropic, Gemini) use them; OpenAI,
+        DeepSeek and others cache long prefixes automatically. Either way the provider
+        reports the cached input tokens.
+        """
+        if not self.prompt_cache_config.get("enabled"):
+            return {}
+        ttl = self.prompt_cache_config.get("ttl", "5m")
+        settings = {}
+        if self.prompt_cache_config.get("instructions", True):
+            settings["openrouter_cache_instructions"] = ttl
+        if self.prompt_cache_config.get("tool_definitions", True):
+            settings["openrouter_cache_tool_definitions"] = ttl
+        if self.prompt_cache_config.get("messages", False):
+            # Also caches the conversation so far, for agents that loop over many tool calls
+            settings["openrouter_cache_messages"] = ttl
+        return settings
+
+    def _build_model(self, model_name: str) -> MeteredModel:
         model = OpenRouterModel(
-            model_name=self.model_name,
+            model_name=model_name,
             provider=OpenRouterProvider(
                 api_key=CONFIG.OPENROUTER_API_KEY
             ),
             settings=OpenRouterModelSettings(
                 temperature=0.1,
                 top_p=0.1,
+                # Lets the manager issue independent sub-agent calls in one step; pydantic_ai runs them concurrently
+                parallel_tool_calls=True,
                 extra_body={
                     "reasoning": {
                         "effort": "high",
                         "exclude": True
                   }
-                }
+                },
+                **self._prompt_cache_settings(),
             )
         )
-        return Agent(model=model, tools=self.tools or [], system_prompt=self.system_prompt, retries=2)
+        return MeteredModel(model, agent_name=self.name, model_name=model_name)
+
+    def _setup_agent(self) -> Agent:
+        model = self._build_model(self.model_name)
+        if self.fallback_models:
+            model = ResilientModel(
+                [(name, self._build_model(name)) for name in [self.model_name, *self.fallback_models]],
+                agent_name=self.name,
+                **self.resilience_config,
+            )
+        tools = list(self.tools or [])
+        capabilities = []
+        if self.compactor is not None:
+            # Also applies to tools registered later, such as sub-agents and delegate_in_parallel
+            capabilities.append(self.compactor)
+            if self.compactor.offload:
+                tools.append(self.compactor.expand_tool())
+        return Agent(model=model, tools=tools, system_prompt=self.system_prompt, retries=2, capabilities=capabilities)
         
 
-    async def run(self, message: str, max_retries: int = 3):
+    def _tool_names(self) -> list[str]:
+        # Includes tools registered later, e.g. sub-agents added through register_as_tool
+        return [name for toolset in self.agent.toolsets for name in getattr(toolset, "tools", {})]
+
+    async def run(self, message: str, max_retries: int = 3, message_history: Optional[list[ModelMessage]] = None):
+        if message_history:
+            # pydantic_ai only adds the system prompt to runs without history
+            history = [ModelRequest(parts=[SystemPromptPart(self.system_prompt)]), *message_history]
+            # Answers depend on the conversation, so they are not cached
+            return (await self._run(message, max_retries, history)).output
+
+        if self.cache is None:
+            return (await self._run(message, max_retries)).output
+
+        task = get_current_task()
+        key = self.cache.key(task.user_id if task else None, self.model_name, self.system_prompt, self._tool_names(), message)
+        cached = await self.cache.get(key)
+        if cached is not None:
+            logger.info(f"[{self.name}] Response cache hit")
+            publisher = get_publisher()
+            if publisher:
+                await publisher.publish("token", agent=self.name, delta=cached, cached=True)
+            return cached
+
+        result = await self._run(message, max_retries)
+        if isinstance(result.output, str) and self.cache.cacheable(result.all_messages()):
+            await self.cache.set(key, result.output)
+        return result.output
+
+    async def _run(self, message: str, max_retries: int, message_history: Optional[list[ModelMessage]] = None):
+        # Stream tokens and tool calls when running inside a published task
+        publisher = get_publisher()
+        event_stream_handler = publisher.stream_handler(self.name) if publisher else None
+        start = time.perf_counter()
         for attempt in range(max_retries):
             try:
-                response = await self.agent.run(message)
-                return response.output
+                response = await self.agent.run(
+                    message, message_history=message_history, event_stream_handler=event_stream_handler
+                )
+                record_agent_run(self.name, time.perf_counter() - start, retries=attempt, failed=False)
+                return response
             except UnexpectedModelBehavior as e:
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt  # Exponential backoff: 1s, 2s, 4s
                     logger.error(f"[{self.name}] OpenRouter error, retrying in {wait_time}s... (attempt {attempt + 1}/{max_retries})")
+                    if publisher:
+                        await publisher.publish("retry", agent=self.name, attempt=attempt + 1)
                     await asyncio.sleep(wait_time)
                 else:
                     logger.error(f"[{self.name}] Failed after {max_retries} attempts: {e}")
+                    record_agent_run(self.name, time.perf_counter() - start, retries=attempt, failed=True)
                     raise
 
 
 class SubAgent(BaseAgent):
+    def __init__(self, *args, delegation_config: dict = None, **kwargs):
+        delegation_config = delegation_config or {}
+        self.timeout = delegation_config.get("timeout")
+        max_concurrency = delegation_config.get("max_concurrency")
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def tool_name(self) -> str:
+        return f"ask_{self.name.lower().replace(' ', '_')}"
+
+    async def delegate(self, message: str):
+        """Run on behalf of a parent agent, bounded by this sub-agent's concurrency limit and timeout."""
+        async with observe_tool(self.tool_name) as call:
+            try:
+                if self._semaphore is None:
+                    return await asyncio.wait_for(self.run(message), timeout=self.timeout)
+                queued = time.perf_counter()
+                async with self._semaphore:
+                    call.queue_seconds = time.perf_counter() - queued
+                    return await asyncio.wait_for(self.run(message), timeout=self.timeout)
+            except TimeoutError:
+                raise TimeoutError(f"{self.name} did not answer within {self.timeout}s")
+
     def register_as_tool(self, parent: Agent, input_schema: Optional[Type[BaseModel]] = None):
-        tool_name = f"ask_{self.name.lower().replace(' ', '_')}"
+        tool_name = self.tool_name
 
         if input_schema:
             async def call_sub_agent(args: input_schema):
                 try:
-                    response = await self.run(str(args.model_dump()))
+                    response = await self.delegate(str(args.model_dump()))
                     return response
                 except Exception as e:
                     return str(e)
@@ -75,7 +205,7 @@ class SubAgent(BaseAgent):
         else:
             async def call_sub_agent(messages: str):
                 try:
-                    response = await self.run(messages)
+                    response = await self.delegate(messages)
                     logger.info(f"[{self.name}] Subagent response: {response[:50]}...")
                     return response
                 except Exception as e:
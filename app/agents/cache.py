@@ -0,0 +1,118 @@
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+from pydantic_ai.messages import ModelMessage, ModelResponse, ToolCallPart
+from app.core.logging import logger
+from app.core.metrics import RESPONSE_CACHE_HITS, RESPONSE_CACHE_MISSES
+from app.core.redis_client import get_async_redis
+
+
+# Runs that called these are never cached: write_pdf creates files owned by the requesting
+# user, and date_tool makes the answer depend on the day it was given
+UNCACHEABLE_TOOLS = ("write_pdf", "date_tool")
+
+
+def normalize_input(message: str) -> str:
+    return re.sub(r"\s+", " ", message).strip()
+
+
+class ResponseCache:
+    """
+    Exact-match cache for agent replies.
+
+    Lookups go to a small in-process LRU first and then to Redis, which is shared
+    by every worker. Keys hash the requesting user, model, system prompt, tool set
+    and normalised input, so changing any of them naturally invalidates old
+    entries and one user's replies are never served to another.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int = 3600,
+        max_entries: int = 256,
+        use_redis: bool = True,
+        uncacheable_tools: tuple[str, ...] = UNCACHEABLE_TOOLS,
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.use_redis = use_redis
+        self.uncacheable_tools = set(uncacheable_tools)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    @classmethod
+    def from_config(cls, namespace: str, cache_config: Optional[dict]) -> Optional["ResponseCache"]:
+        """Build a cache from an agent's `cache` block in config.json; disabled when absent."""
+        if not cache_config or not cache_config.get("enabled", False):
+            return None
+        return cls(
+            namespace=namespace,
+            ttl=cache_config.get("ttl", 3600),
+            max_entries=cache_config.get("max_entries", 256),
+            use_redis=cache_config.get("redis", True),
+            uncacheable_tools=cache_config.get("uncacheable_tools", UNCACHEABLE_TOOLS),
+        )
+
+    def key(self, user_id: Optional[str], model_name: str, system_prompt: str, tool_names: list[str], message: str) -> str:
+        payload = json.dumps(
+            {
+                "user": user_id,
+                "model": model_name,
+                "system_prompt": system_prompt,
+                "tools": sorted(tool_names),
+                "input": normalize_input(message),
+            },
+            sort_keys=True,
+        )
+        return f"agent_cache:{self.namespace}:{hashlib.sha256(payload.encode()).hexdigest()}"
+
+    def cacheable(self, messages: list[ModelMessage]) -> bool:
+        """False when the run called a tool whose effects a cached reply would skip."""
+        return not any(
+            isinstance(part, ToolCallPart) and part.tool_name in self.uncacheable_tools
+            for message in messages
+            if isinstance(message, ModelResponse)
+            for part in message.parts
+        )
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                RESPONSE_CACHE_HITS.labels(self.namespace, "memory").inc()
+                return value
+            del self._entries[key]
+
+        if self.use_redis:
+            try:
+                value = await get_async_redis().get(key)
+            except Exception as e:
+                logger.error(f"[{self.namespace}] Response cache read failed: {e}")
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                RESPONSE_CACHE_HITS.labels(self.namespace, "redis").inc()
+                return value
+
+        RESPONSE_CACHE_MISSES.labels(self.namespace).inc()
+        return None
+
+    async def set(self, key: str, value: str):
+        self._remember(key, value)
+        if self.use_redis:
+            try:
+                await get_async_redis().set(key, value, ex=self.ttl)
+            except Exception as e:
+                logger.error(f"[{self.namespace}] Response cache write failed: {e}")
+
+    def _remember(self, key: str, value: str):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
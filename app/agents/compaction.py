@@ -0,0 +1,282 @@
+import json
+import math
+import re
+from collections import OrderedDict
+from dataclasses import replace
+from typing import Optional
+from uuid import uuid4
+from pydantic_ai import Tool
+from pydantic_ai.capabilities import AbstractCapability
+from pydantic_ai.messages import ModelRequest, ToolReturnPart
+from app.agents.conversation import estimate_tokens
+from app.core.logging import logger
+from app.core.metrics import TOOL_OUTPUT_TOKENS
+from app.core.redis_client import get_async_redis
+
+
+EXPAND_TOOL_NAME = "expand_tool_output"
+
+# Whole lines that carry nothing for the model: navigation, cookie banners, share widgets
+BOILERPLATE_LINE = re.compile(
+    r"^(?:skip to (?:main )?content|back to top|read more|advertisement|"
+    r"(?:accept|reject) (?:all )?cookies|we use cookies\b.*|cookie (?:policy|settings)\b.*|"
+    r"subscribe\b.*newsletter.*|sign (?:up|in)(?: for free)?|log ?in|privacy policy|terms of (?:use|service)|"
+    r"all rights reserved\b.*|copyright\b.*|©.*|share (?:this|on)\b.*|click here\b.*|"
+    r"(?:please )?enable javascript\b.*|javascript is (?:disabled|required)\b.*)$",
+    re.IGNORECASE,
+)
+# Trailing clutter search engines leave on snippets
+SNIPPET_TAIL = re.compile(r"(?:\s*(?:\.\.\.|…|read more|continue reading))+\s*$", re.IGNORECASE)
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+OMITTED_NOTE = re.compile(r"\n\n\[\d+ tokens omitted[^\]]*\]$")
+# Shorter repeated lines (separators, "- None") are left alone
+MIN_DEDUPE_CHARS = 20
+
+
+def _dedupe_key(text: str) -> str:
+    return re.sub(r"[\W_]+", " ", text).strip().lower()
+
+
+def format_search_results(results: list[dict]) -> str:
+    """Search results as one line each, without repeated URLs or snippets."""
+    seen = set()
+    lines = []
+    for item in results:
+        href = item.get("href", "")
+        body = SNIPPET_TAIL.sub("", re.sub(r"\s+", " ", item.get("body", ""))).strip()
+        key = _dedupe_key(body)
+        if href in seen or (key and key in seen):
+            continue
+        seen.update((href, key))
+        lines.append(f"- {item.get('title', '').strip()} ({href}): {body}")
+    return "\n".join(lines)
+
+
+def clean_text(text: str) -> str:
+    """Drop boilerplate and repeated lines, and collapse runs of blank lines."""
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        stripped = line.strip(" -*#>\t")
+        if stripped and BOILERPLATE_LINE.match(stripped):
+            continue
+        key = _dedupe_key(stripped)
+        if len(key) >= MIN_DEDUPE_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        if not line and (not lines or not lines[-1]):
+            continue
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _cut(block: str, max_chars: int) -> str:
+    """The leading whole lines, then whole sentences, of a block that fit in max_chars."""
+    if len(block) <= max_chars:
+        return block
+    kept = []
+    used = 0
+    for line in block.splitlines():
+        if used + len(line) + 1 <= max_chars:
+            kept.append(line)
+            used += len(line) + 1
+            continue
+        sentences = []
+        for sentence in SENTENCE_END.split(line):
+            if used + len(sentence) + 1 > max_chars:
+                break
+            sentences.append(sentence)
+            used += len(sentence) + 1
+        if sentences:
+            kept.append(" ".join(sentences))
+        break
+    if not kept:
+        # Not even one sentence fits: cut at a word boundary
+        return block[:max_chars].rsplit(" ", 1)[0] + " …"
+    return "\n".join(kept) + " …"
+
+
+def truncate(text: str, budget_tokens: int) -> str:
+    """
+    Shorten text to about budget_tokens by keeping the start of every paragraph.
+
+    The budget is shared fairly between paragraphs (short ones keep all of
+    their text, the rest split what is left), so later sections such as the
+    second delegated task or the last search query still get a say.
+    """
+    if estimate_tokens(text) <= budget_tokens:
+        return text
+    blocks = [block for block in re.split(r"\n\s*\n", text) if block.strip()]
+    remaining = budget_tokens * 4
+    allowances = {}
+    for position, index in enumerate(sorted(range(len(blocks)), key=lambda i: len(blocks[i]))):
+        allowances[index] = min(len(blocks[index]), remaining // (len(blocks) - position))
+        remaining -= allowances[index]
+    kept = [_cut(block, allowances[index]) for index, block in enumerate(blocks) if allowances[index] > 0]
+    return "\n\n".join(kept)
+
+
+class ToolOutputCompactor(AbstractCapability):
+    """
+    Compacts what an agent's tools return before it enters the model context.
+
+    Search results are deduplicated and reduced to one line each, text outputs
+    lose boilerplate and repeated lines, and anything still over the tool's
+    token budget is truncated extractively. Once the tool outputs of a run
+    exceed `history_budget`, the oldest are sent to the model as short extracts
+    (`stub_budget` tokens), so the prompt stops growing with every tool call.
+
+    With offload enabled the full (cleaned) output is kept in Redis, and
+    truncated or shortened outputs carry a handle the model can read back
+    through the expand_tool_output tool.
+    """
+
+    def __init__(
+        self,
+        agent_name: str,
+        budgets: Optional[dict] = None,
+        default_budget: Optional[int] = None,
+        history_budget: Optional[int] = None,
+        stub_budget: int = 100,
+        offload: bool = False,
+        offload_ttl: int = 3600,
+    ):
+        self.agent_name = agent_name
+        self.budgets = budgets or {}
+        self.default_budget = default_budget
+        self.history_budget = history_budget
+        self.stub_budget = stub_budget
+        self.offload = offload
+        self.offload_ttl = offload_ttl
+        # Offload handles by tool call id, for outputs shortened on a later turn
+        self._handles: OrderedDict[str, str] = OrderedDict()
+
+    @classmethod
+    def from_config(cls, agent_name: str, config: Optional[dict]) -> Optional["ToolOutputCompactor"]:
+        """Build a compactor from an agent's `tool_output` block in config.json; disabled when absent."""
+        if not config or not config.get("enabled", False):
+            return None
+        return cls(
+            agent_name=agent_name,
+            budgets=config.get("budgets"),
+            default_budget=config.get("default_budget"),
+            history_budget=config.get("history_budget"),
+            stub_budget=config.get("stub_budget", 100),
+            offload=config.get("offload", False),
+            offload_ttl=config.get("offload_ttl", 3600),
+        )
+
+    def budget_for(self, tool: str) -> Optional[int]:
+        return self.budgets.get(tool, self.default_budget)
+
+    async def after_tool_execute(self, ctx, *, call, tool_def, args, result):
+        if call.tool_name == EXPAND_TOOL_NAME:
+            return result
+        return await self.compact(call.tool_name, result, call.tool_call_id)
+
+    async def before_model_request(self, ctx, request_context):
+        if not self.history_budget:
+            return request_context
+        messages = list(request_context.messages)
+        returns = [
+            (message_index, part_index)
+            for message_index, message in enumerate(messages)
+            if isinstance(message, ModelRequest)
+            for part_index, part in enumerate(message.parts)
+            if isinstance(part, ToolReturnPart) and isinstance(part.content, str)
+        ]
+        over = sum(estimate_tokens(messages[m].parts[p].content) for m, p in returns) - self.history_budget
+        # Oldest first; the results the model is about to see for the first time stay whole
+        for message_index, part_index in returns:
+            if over <= 0 or message_index == len(messages) - 1:
+                break
+            part = messages[message_index].parts[part_index]
+            shortened = self._shorten(part)
+            saved = estimate_tokens(part.content) - estimate_tokens(shortened)
+            if saved <= 0:
+                continue
+            parts = list(messages[message_index].parts)
+            parts[part_index] = replace(part, content=shortened)
+            # Only this request's copy changes; the run history keeps the full output
+            messages[message_index] = replace(messages[message_index], parts=parts)
+            over -= saved
+        return replace(request_context, messages=messages)
+
+    def _shorten(self, part: ToolReturnPart) -> str:
+        """Deterministic, so the rewritten prefix is identical on every later turn."""
+        extract = truncate(OMITTED_NOTE.sub("", part.content), self.stub_budget)
+        handle = self._handles.get(part.tool_call_id)
+        if handle:
+            return extract + f'\n\n[earlier {part.tool_name} output shortened; call {EXPAND_TOOL_NAME}(handle="{handle}") to read it in full]'
+        return extract + f"\n\n[earlier {part.tool_name} output shortened]"
+
+    async def compact(self, tool: str, result, tool_call_id: Optional[str] = None):
+        if isinstance(result, list) and all(isinstance(item, dict) for item in result):
+            raw_tokens = estimate_tokens(json.dumps(result, default=str))
+            text = format_search_results(result)
+        elif isinstance(result, str):
+            raw_tokens = estimate_tokens(result)
+            text = clean_text(result)
+        else:
+            return result
+
+        handle = None
+        if self.offload and estimate_tokens(text) > self.stub_budget:
+            handle = await self._offload(text)
+            if handle and tool_call_id:
+                self._handles[tool_call_id] = handle
+                while len(self._handles) > 10_000:
+                    self._handles.popitem(last=False)
+
+        budget = self.budget_for(tool)
+        compacted = truncate(text, budget) if budget else text
+        if compacted != text:
+            omitted = estimate_tokens(text) - estimate_tokens(compacted)
+            if handle:
+                compacted += f'\n\n[{omitted} tokens omitted; call {EXPAND_TOOL_NAME}(handle="{handle}") to read the full output]'
+            else:
+                compacted += f"\n\n[{omitted} tokens omitted]"
+
+        tokens = estimate_tokens(compacted)
+        TOOL_OUTPUT_TOKENS.labels(self.agent_name, tool, "raw").inc(raw_tokens)
+        TOOL_OUTPUT_TOKENS.labels(self.agent_name, tool, "compacted").inc(tokens)
+        if tokens < raw_tokens:
+            logger.info(f"[{self.agent_name}] Compacted {tool} output from {raw_tokens} to {tokens} tokens")
+        return compacted
+
+    async def _offload(self, text: str) -> Optional[str]:
+        handle = uuid4().hex
+        try:
+            await get_async_redis().set(f"tool_output:{handle}", text, ex=self.offload_ttl)
+        except Exception as e:
+            # The truncated output is still usable without a handle
+            logger.error(f"[{self.agent_name}] Failed to offload tool output: {e}")
+            return None
+        return handle
+
+    def expand_tool(self) -> Tool:
+        """Tool that reads an offloaded output back, one budget-sized part at a time."""
+        part_chars = (self.default_budget or 1500) * 4
+
+        async def expand_tool_output(handle: str, part: int = 1) -> str:
+            """
+            Read the full text of a tool output that was shortened, one part at a time.
+
+            Args:
+                handle: The handle given in the shortened output.
+                part: Which part to read, starting at 1.
+            """
+            try:
+                text = await get_async_redis().get(f"tool_output:{handle}")
+            except Exception as e:
+                logger.error(f"[{self.agent_name}] Failed to read offloaded tool output: {e}")
+                text = None
+            if text is None:
+                return "This tool output has expired or the handle is unknown."
+            parts = max(1, math.ceil(len(text) / part_chars))
+            part = min(max(part, 1), parts)
+            return f"[part {part} of {parts}]\n" + text[(part - 1) * part_chars:part * part_chars]
+
+        return Tool(expand_tool_output, name=EXPAND_TOOL_NAME)
@@ -0,0 +1,140 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Optional
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelMessage, ModelRequest, ModelResponse, TextPart, UserPromptPart
+from sqlalchemy import and_, or_, select, update
+from app.core.config import CONFIG
+from app.core.database import SessionLocal
+from app.core.logging import logger
+from app.enums.messages import MessageRole
+from app.models.conversations import Conversation
+from app.models.messages import Message
+
+
+SUMMARY_PROMPT = (
+    "You maintain the running summary of a conversation between a user and an AI agency. "
+    "Merge the new turns into the existing summary. Keep facts, decisions, names, figures, "
+    "open questions and the documents produced; drop pleasantries. Answer with the summary only."
+)
+
+
+def estimate_tokens(text: str) -> int:
+    # ~4 characters per token; good enough for budgeting without loading a tokenizer
+    return len(text) // 4 + 1
+
+
+@dataclass
+class Turn:
+    id: str
+    role: MessageRole
+    content: str
+
+
+@dataclass
+class ConversationState:
+    """A conversation as seen by one run: its rolling summary and the turns not yet summarised, oldest first."""
+    conversation_id: str
+    summary: Optional[str]
+    turns: list[Turn]
+
+
+def load_conversation(message_id: str) -> Optional[ConversationState]:
+    """Load the conversation the given (current) user message belongs to, excluding that message."""
+    with SessionLocal() as db:
+        message = db.get(Message, message_id)
+        if message is None or message.conversation_id is None:
+            return None
+        conversation = db.get(Conversation, message.conversation_id)
+
+        query = select(Message.id, Message.role, Message.content).where(
+            Message.conversation_id == conversation.id,
+            or_(
+                Message.created_at < message.created_at,
+                and_(Message.created_at == message.created_at, Message.id < message.id),
+            ),
+        )
+        until = db.get(Message, conversation.summarized_until_id) if conversation.summarized_until_id else None
+        if until is not None:
+            query = query.where(
+                or_(Message.created_at > until.created_at, and_(Message.created_at == until.created_at, Message.id > until.id))
+            )
+        rows = db.execute(query.order_by(Message.created_at, Message.id)).all()
+        return ConversationState(conversation.id, conversation.summary, [Turn(*row) for row in rows])
+
+
+def save_summary(conversation_id: str, summary: str, until_id: str):
+    with SessionLocal() as db:
+        db.execute(
+            update(Conversation)
+            .where(Conversation.id == conversation_id)
+            .values(summary=summary, summarized_until_id=until_id)
+        )
+        db.commit()
+
+
+class ConversationMemory:
+    """
+    Turns a conversation into a bounded pydantic_ai message_history.
+
+    The newest turns are replayed verbatim while they fit in `token_budget`.
+    When they no longer fit, older turns are folded into the conversation's
+    rolling summary, which is stored on the Conversation row and reused by later
+    runs. Compaction goes down to half the budget so the summary is refreshed
+    every few turns rather than on every run, and the prompt stays roughly the
+    same size however long the conversation gets.
+    """
+
+    def __init__(self, summarizer: Agent, token_budget: int, summary_tokens: int):
+        self.summarizer = summarizer
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+
+    def _fitting(self, turns: list[Turn], budget: int) -> int:
+        used = 0
+        count = 0
+        for turn in reversed(turns):
+            used += estimate_tokens(turn.content)
+            if used > budget:
+                break
+            count += 1
+        return count
+
+    def split(self, turns: list[Turn]) -> tuple[list[Turn], list[Turn]]:
+        """Return (turns to summarise, turns to replay)."""
+        if self._fitting(turns, self.token_budget) == len(turns):
+            return [], turns
+        keep = self._fitting(turns, self.token_budget // 2)
+        return turns[:len(turns) - keep], turns[len(turns) - keep:]
+
+    async def summarize(self, summary: Optional[str], turns: list[Turn]) -> str:
+        transcript = "\n\n".join(f"{turn.role.value}: {turn.content}" for turn in turns)
+        prompt = f"Current summary:\n{summary or '(empty)'}\n\nNew turns:\n{transcript}"
+        result = await self.summarizer.run(prompt, model_settings={"max_tokens": self.summary_tokens})
+        return result.output
+
+    async def history(self, state: ConversationState) -> list[ModelMessage]:
+        older, window = self.split(state.turns)
+        summary = state.summary
+        if older:
+            try:
+                summary = await self.summarize(summary, older)
+                await asyncio.to_thread(save_summary, state.conversation_id, summary, older[-1].id)
+            except Exception as e:
+                # Answer with the window alone rather than fail the run; the next run retries
+                logger.error(f"[{state.conversation_id}] Conversation summary failed: {e}")
+
+        messages: list[ModelMessage] = []
+        if summary:
+            messages.append(ModelRequest(parts=[UserPromptPart(f"Summary of the conversation so far:\n{summary}")]))
+        for turn in window:
+            if turn.role == MessageRole.USER:
+                messages.append(ModelRequest(parts=[UserPromptPart(turn.content)]))
+            else:
+                messages.append(ModelResponse(parts=[TextPart(turn.content)]))
+        return messages
+
+    @classmethod
+    def from_config(cls, model) -> "ConversationMemory":
+        summarizer = Agent(model=model, system_prompt=SUMMARY_PROMPT)
+        return cls(summarizer, CONFIG.CONVERSATION_TOKEN_BUDGET, CONFIG.CONVERSATION_SUMMARY_TOKENS)
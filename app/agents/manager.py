@@ -1,17 +1,46 @@
+import asyncio
+from typing import Optional
+from app.agents.conversation import ConversationMemory, ConversationState
 from app.agents.specialized_agents import LegalAgent, ManagerAgent, ResearchAgent
-from app.agents.schemas.manager import LegalAgentRequest
+from app.agents.schemas.manager import LegalAgentRequest, DelegateAgent, DelegatedTask
+from app.core.logging import logger
 
 class AgentOrchestrator:
     def __init__(self):
         self.manager_agent = ManagerAgent()
         self.legal_agent = LegalAgent()
         self.research_agent = ResearchAgent()
+        # Summaries are written with the manager's model
+        self.memory = ConversationMemory.from_config(self.manager_agent.agent.model)
         self._setup_orchestrator()
 
     def _setup_orchestrator(self):
         # Register legal agent as a tool for the manager agent's inner pydantic agent
         self.legal_agent.register_as_tool(self.manager_agent.agent, LegalAgentRequest)
         self.research_agent.register_as_tool(self.manager_agent.agent)
+        self.manager_agent.agent.tool_plain(self.delegate_in_parallel)
 
-    async def run(self, message: str):
-        return await self.manager_agent.run(message)
+    async def _delegate(self, task: DelegatedTask) -> str:
+        try:
+            if task.agent == DelegateAgent.LEGAL:
+                request = LegalAgentRequest(mode=task.legal_mode, prompt=task.prompt, write_pdf=task.write_pdf)
+                return await self.legal_agent.delegate(str(request.model_dump()))
+            return await self.research_agent.delegate(task.prompt)
+        except Exception as e:
+            logger.error(f"[Manager Agent] Delegated {task.agent.value} task failed: {e}")
+            return f"Failed: {e}"
+
+    async def delegate_in_parallel(self, tasks: list[DelegatedTask]) -> str:
+        """
+        Hand several independent tasks to the legal and research agents at once; they run concurrently.
+        Only use this for tasks that don't depend on each other's results.
+        """
+        results = await asyncio.gather(*(self._delegate(task) for task in tasks))
+        return "\n\n".join(
+            f"## Task {index} ({task.agent.value}): {task.prompt}\n{result}"
+            for index, (task, result) in enumerate(zip(tasks, results), start=1)
+        )
+
+    async def run(self, message: str, conversation: Optional[ConversationState] = None):
+        history = await self.memory.history(conversation) if conversation else None
+        return await self.manager_agent.run(message, message_history=history)
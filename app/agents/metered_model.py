@@ -0,0 +1,41 @@
+import time
+from contextlib import asynccontextmanager
+from pydantic_ai.models.wrapper import WrapperModel
+from app.core.events import get_publisher
+from app.core.metrics import record_model_call
+
+
+class MeteredModel(WrapperModel):
+    """
+    Records latency, tokens and estimated cost of every request made through the wrapped model.
+
+    Inside a task each request is also published as a `model_call` event (kept in
+    the task trace) with its cached and uncached input tokens.
+    """
+
+    def __init__(self, wrapped, agent_name: str, model_name: str):
+        super().__init__(wrapped)
+        self.agent_name = agent_name
+        self.metered_name = model_name
+
+    async def _record(self, seconds: float, usage):
+        call = record_model_call(self.agent_name, self.metered_name, seconds, usage)
+        publisher = get_publisher()
+        if publisher is not None:
+            await publisher.publish("model_call", agent=self.agent_name, model=self.metered_name, seconds=round(seconds, 3), **call)
+
+    async def request(self, messages, model_settings, model_request_parameters):
+        start = time.perf_counter()
+        response = await super().request(messages, model_settings, model_request_parameters)
+        await self._record(time.perf_counter() - start, response.usage)
+        return response
+
+    @asynccontextmanager
+    async def request_stream(self, messages, model_settings, model_request_parameters, run_context=None):
+        start = time.perf_counter()
+        async with super().request_stream(
+            messages, model_settings, model_request_parameters, run_context
+        ) as response_stream:
+            yield response_stream
+        # Usage is complete once the stream has been consumed
+        await self._record(time.perf_counter() - start, response_stream.get().usage)
@@ -0,0 +1,90 @@
+import os
+import threading
+from typing import Optional
+from app.agents.conversation import ConversationState
+from app.agents.manager import AgentOrchestrator
+from app.core.config import CONFIG
+from app.core.event_loop import WorkerLoop
+from app.core.events import task_events
+from app.core.task_context import TaskContext, set_current_task, reset_current_task
+from app.core.logging import logger
+
+
+class OrchestratorPool:
+    """
+    Holds one warm AgentOrchestrator per worker process.
+
+    Building the orchestrator creates three OpenRouter models (each with its own
+    HTTP client), three A2A apps and re-registers the sub-agent tools, so it is
+    done once per process and reused by every task that process runs. The
+    orchestrator keeps no per-run state; pydantic_ai agents are safe to run
+    repeatedly.
+
+    The HTTP clients bind their connection pools to the event loop they first
+    run on, so every run goes through one long-lived WorkerLoop per process
+    instead of a fresh asyncio.run() per task. With a threaded Celery pool up to
+    AGENT_MAX_CONCURRENCY runs share that loop at the same time.
+    """
+
+    def __init__(self):
+        self._orchestrator: Optional[AgentOrchestrator] = None
+        self._loop: Optional[WorkerLoop] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def init(self) -> AgentOrchestrator:
+        with self._lock:
+            # A pool inherited through fork() shares sockets with the parent, so rebuild it
+            if self._orchestrator is None or self._pid != os.getpid():
+                self._orchestrator = AgentOrchestrator()
+                self._loop = WorkerLoop(max_concurrency=CONFIG.AGENT_MAX_CONCURRENCY)
+                self._loop.start()
+                self._pid = os.getpid()
+                logger.info(f"Orchestrator pool initialised in process {self._pid}")
+            return self._orchestrator
+
+    def get(self) -> AgentOrchestrator:
+        if self._orchestrator is None or self._pid != os.getpid():
+            return self.init()
+        return self._orchestrator
+
+    def run(
+        self,
+        message: str,
+        task: Optional[TaskContext] = None,
+        timeout: Optional[float] = None,
+        conversation: Optional[ConversationState] = None,
+    ):
+        orchestrator = self.get()
+        if task:
+            coro = self._run_task(orchestrator, message, task, conversation)
+        else:
+            coro = orchestrator.run(message, conversation)
+        return self._loop.run(coro, timeout=timeout or CONFIG.AGENT_RUN_TIMEOUT)
+
+    async def _run_task(
+        self,
+        orchestrator: AgentOrchestrator,
+        message: str,
+        task: TaskContext,
+        conversation: Optional[ConversationState] = None,
+    ):
+        token = set_current_task(task)
+        try:
+            async with task_events(task.task_id, task.trace) as publisher:
+                result = await orchestrator.run(message, conversation)
+                await publisher.publish("final", state="SUCCESS", result=result)
+                return result
+        finally:
+            reset_current_task(token)
+
+    def close(self):
+        with self._lock:
+            if self._loop is not None and self._pid == os.getpid():
+                self._loop.stop()
+            self._orchestrator = None
+            self._loop = None
+            self._pid = None
+
+
+orchestrator_pool = OrchestratorPool()
@@ -0,0 +1,271 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+from pydantic_ai.exceptions import ModelHTTPError
+from pydantic_ai.models import Model
+from pydantic_ai.models.wrapper import WrapperModel
+from app.core.logging import logger
+from app.core.metrics import MODEL_FAILOVERS, MODEL_HEDGES
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a model after repeated failures.
+
+    After `failure_threshold` consecutive failures the breaker opens for
+    `reset_seconds`; then one trial request is let through (half-open) and its
+    outcome closes or re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def release_trial(self):
+        """Let another trial through after a half-open request ended without a verdict."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Recent latency samples of one model and request kind, for the hedging threshold."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, percentile: float, min_samples: int) -> Optional[float]:
+        if len(self._samples) < min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percentile / 100))]
+
+
+# Shared by every agent in the process: an upstream outage affects all agents using that model
+_breakers: dict[str, CircuitBreaker] = {}
+_latencies: dict[tuple[str, str], LatencyTracker] = {}
+
+# Streamed requests are timed to the first token, plain ones to the full response;
+# the two are kept apart so one kind never sets the hedge delay of the other
+TTFT = "ttft"
+FULL_RESPONSE = "response"
+
+
+def get_breaker(model_name: str, failure_threshold: int = 5, reset_seconds: float = 30.0) -> CircuitBreaker:
+    if model_name not in _breakers:
+        _breakers[model_name] = CircuitBreaker(failure_threshold, reset_seconds)
+    return _breakers[model_name]
+
+
+def get_latency_tracker(model_name: str, kind: str) -> LatencyTracker:
+    key = (model_name, kind)
+    if key not in _latencies:
+        _latencies[key] = LatencyTracker()
+    return _latencies[key]
+
+
+def counts_against_model(error: Exception) -> bool:
+    # A rejected request (bad input, context too long) says nothing about the model's health
+    if isinstance(error, ModelHTTPError):
+        return error.status_code >= 500 or error.status_code == 429
+    return True
+
+
+class ResilientModel(WrapperModel):
+    """
+    Tries an ordered list of models, skipping those whose circuit breaker is open.
+
+    A failing model is followed by the next one. With hedging enabled, if the
+    current model has not answered after the hedge delay (the observed p95
+    latency of that model for the same kind of request, or `hedge_delay` until
+    enough samples exist) the next model is started as well and whichever
+    answers first is used; the slower request is cancelled. Streamed requests
+    are measured to the first token, plain requests to the full response.
+
+    For streamed requests pydantic_ai's OpenAI-compatible models only return
+    the stream once the first chunk has arrived, so opening the stream is the
+    time-to-first-token.
+    """
+
+    def __init__(
+        self,
+        models: list[tuple[str, Model]],
+        agent_name: str,
+        hedge: bool = False,
+        hedge_delay: float = 10.0,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        failure_threshold: int = 5,
+        reset_seconds: float = 30.0,
+    ):
+        super().__init__(models[0][1])
+        self.models = models
+        self.agent_name = agent_name
+        self.hedge = hedge and len(models) > 1
+        self.hedge_delay = hedge_delay
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breakers = {name: get_breaker(name, failure_threshold, reset_seconds) for name, _ in models}
+
+    def _delay_for(self, name: str, kind: str) -> float:
+        observed = get_latency_tracker(name, kind).percentile(self.hedge_percentile, self.hedge_min_samples)
+        return observed if observed is not None else self.hedge_delay
+
+    async def _race(self, attempt, kind: str, discard=None):
+        """
+        Run `attempt(name, model)` over the models in order, failing over and hedging.
+
+        `kind` says what an attempt's duration measures (TTFT or FULL_RESPONSE).
+
+        Returns the result of the first attempt to succeed and cancels the rest;
+        `discard` is called on results of attempts that also succeeded but lost.
+        """
+        queue = list(self.models)
+        pending: dict[asyncio.Task, str] = {}
+        errors: list[Exception] = []
+
+        def start_next() -> bool:
+            while queue:
+                name, model = queue.pop(0)
+                if self.breakers[name].allow():
+                    task = asyncio.ensure_future(self._timed(name, kind, attempt(name, model)))
+                    pending[task] = name
+                    return True
+            return False
+
+        def can_hedge() -> bool:
+            return self.hedge and any(self.breakers[name].state != "open" for name, _ in queue)
+
+        if not start_next():
+            # Every breaker is open: trying the primary beats failing the run outright
+            name, model = self.models[0]
+            pending[asyncio.ensure_future(self._timed(name, kind, attempt(name, model)))] = name
+
+        try:
+            while pending:
+                newest = list(pending.values())[-1]
+                timeout = self._delay_for(newest, kind) if can_hedge() else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if start_next():
+                        MODEL_HEDGES.labels(self.agent_name).inc()
+                        logger.info(f"[{self.agent_name}] {newest} is slow, hedging with {list(pending.values())[-1]}")
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    error = task.exception()
+                    if error is None:
+                        self.breakers[name].record_success()
+                        return task.result()
+                    errors.append(error)
+                    if counts_against_model(error):
+                        self.breakers[name].record_failure()
+                    else:
+                        self.breakers[name].release_trial()
+                    MODEL_FAILOVERS.labels(self.agent_name, name).inc()
+                    logger.error(f"[{self.agent_name}] Model {name} failed: {error}")
+                if not pending:
+                    start_next()
+            raise errors[-1]
+        finally:
+            for task, name in pending.items():
+                task.cancel()
+                self.breakers[name].release_trial()
+            for result in await asyncio.gather(*pending, return_exceptions=True):
+                if discard is not None and not isinstance(result, BaseException):
+                    discard(result)
+
+    async def _timed(self, name: str, kind: str, coro):
+        start = time.perf_counter()
+        result = await coro
+        get_latency_tracker(name, kind).add(time.perf_counter() - start)
+        return result
+
+    async def request(self, messages, model_settings, model_request_parameters):
+        async def attempt(name, model):
+            return await model.request(messages, model_settings, model_request_parameters)
+
+        return await self._race(attempt, FULL_RESPONSE)
+
+    @asynccontextmanager
+    async def request_stream(self, messages, model_settings, model_request_parameters, run_context=None):
+        async def attempt(name, model):
+            # The stream stays open in its own task until the caller is done with it,
+            # so a losing attempt can be cancelled without touching the winner
+            opened = asyncio.get_running_loop().create_future()
+            release = asyncio.Event()
+
+            async def hold():
+                try:
+                    async with model.request_stream(
+                        messages, model_settings, model_request_parameters, run_context
+                    ) as response_stream:
+                        opened.set_result(response_stream)
+                        await release.wait()
+                except asyncio.CancelledError:
+                    opened.cancel()
+                    raise
+                except Exception as e:
+                    if not opened.done():
+                        opened.set_exception(e)
+                    raise
+
+            holder = asyncio.ensure_future(hold())
+            try:
+                response_stream = await asyncio.shield(opened)
+            except BaseException:
+                holder.cancel()
+                await asyncio.gather(holder, return_exceptions=True)
+                raise
+            return response_stream, release, holder
+
+        def discard(result):
+            # A losing stream that opened anyway is closed by its holder task
+            result[1].set()
+
+        response_stream, release, holder = await self._race(attempt, TTFT, discard)
+        try:
+            yield response_stream
+        finally:
+            release.set()
+            await asyncio.gather(holder, return_exceptions=True)
@@ -14,4 +14,15 @@ class LegalAgentRequest(BaseModel):
     mode: LegalAgentMode = Field(description="The mode of the legal agent.")
     prompt: str = Field(description="The prompt for the legal agent.")
     write_pdf: bool = Field(description="Whether to write the pdf.")
-    
\ No newline at end of file
+
+
+class DelegateAgent(Enum):
+    LEGAL = "legal"
+    RESEARCH = "research"
+
+
+class DelegatedTask(BaseModel):
+    agent: DelegateAgent = Field(description="The sub-agent to hand this task to.")
+    prompt: str = Field(description="The self-contained task for the sub-agent.")
+    legal_mode: LegalAgentMode = Field(LegalAgentMode.DRAFT, description="The mode of the legal agent (legal tasks only).")
+    write_pdf: bool = Field(False, description="Whether the legal agent should write the pdf (legal tasks only).")
@@ -1,21 +1,21 @@
 from pathlib import Path
 from app.agents.base import SubAgent
 from app.agents.tools.pdf_tool import write_pdf
-from app.agents.tools.search_tool import robust_search_tool
+from app.agents.tools.search_tool import robust_search_tool, robust_batch_search_tool
+from app.core.agent_config import load_agent_config
 from datetime import datetime, timezone
-import json
-from pathlib import Path
-
-
 
-config_path = Path(__file__).parent.parent.parent / "config" / "config.json"
 
-with open(config_path, "r") as f:
-    config = json.load(f)
+def model_options(agent_config: dict) -> dict:
+    """Primary model, fallbacks, resilience and prompt cache settings from an agent's config entry."""
+    models = agent_config.get("models") or [agent_config["model"]]
+    return {
+        "model_name": models[0],
+        "fallback_models": models[1:],
+        "resilience_config": agent_config.get("resilience"),
+        "prompt_cache_config": agent_config.get("prompt_cache"),
+    }
 
-legal_agent_config = config["legal_agent"]
-manager_agent_config = config["manager_agent"]
-research_agent_config = config["research_agent"]
 
 def date_tool():
     return datetime.now(timezone.utc).isoformat()
@@ -35,29 +35,40 @@ def load_prompt(prompt_name: str) -> str:
 
 class LegalAgent(SubAgent):
     def __init__(self):
+        legal_agent_config = load_agent_config()["legal_agent"]
         super().__init__(
             name="Legal Agent",
-            model_name=legal_agent_config["model"],
+            **model_options(legal_agent_config),
             system_prompt=load_prompt("legal_agent"),
             tools=[write_pdf, date_tool],
-            description="Handle legal matters, contracts, compliance, and regulatory frameworks."
+            description="Handle legal matters, contracts, compliance, and regulatory frameworks.",
+            cache_config=legal_agent_config.get("cache"),
+            tool_output_config=legal_agent_config.get("tool_output"),
+            delegation_config=legal_agent_config.get("delegation"),
         )
 
 class ManagerAgent(SubAgent):
     def __init__(self):
+        manager_agent_config = load_agent_config()["manager_agent"]
         super().__init__(
             name="Manager Agent",
-            model_name=manager_agent_config["model"],
+            **model_options(manager_agent_config),
             system_prompt=load_prompt("manager_agent"),
-            description="Handle overall project management, task delegation, strategic planning, and quality assurance."
+            description="Handle overall project management, task delegation, strategic planning, and quality assurance.",
+            cache_config=manager_agent_config.get("cache"),
+            tool_output_config=manager_agent_config.get("tool_output"),
         )
 
 class ResearchAgent(SubAgent):
     def __init__(self):
+        research_agent_config = load_agent_config()["research_agent"]
         super().__init__(
             name="Research Agent",
-            model_name=research_agent_config["model"],
+            **model_options(research_agent_config),
             system_prompt=load_prompt("research_agent"),
-            tools=[robust_search_tool(), date_tool],
-            description="Conduct research, gather information, and synthesize findings from web searches."
+            tools=[robust_search_tool(), robust_batch_search_tool(), date_tool],
+            description="Conduct research, gather information, and synthesize findings from web searches.",
+            cache_config=research_agent_config.get("cache"),
+            tool_output_config=research_agent_config.get("tool_output"),
+            delegation_config=research_agent_config.get("delegation"),
         )
\ No newline at end of file
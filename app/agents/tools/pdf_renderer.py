@@ -0,0 +1,140 @@
+import asyncio
+import multiprocessing
+import os
+import pathlib
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+from app.core.logging import logger
+
+
+root_path = pathlib.Path(__file__).parent.parent.parent.parent
+templates_path = root_path / "templates"
+
+TEMPLATE_NAME = "legal_template.html"
+STYLESHEET_NAME = "legal_template.css"
+
+# Per-render-worker state, filled once by _init_render_worker
+_template = None
+_stylesheet = None
+_font_config = None
+
+
+def _init_render_worker():
+    """Parse the template, stylesheet and font configuration once per render worker."""
+    global _template, _stylesheet, _font_config
+    from jinja2 import Environment, FileSystemLoader
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+
+    _font_config = FontConfiguration()
+    _template = Environment(loader=FileSystemLoader(templates_path)).get_template(TEMPLATE_NAME)
+    _stylesheet = CSS(filename=str(templates_path / STYLESHEET_NAME), font_config=_font_config)
+
+
+def _render_pdf(title: str, date: str, content: str, pdf_path: str) -> float:
+    """Render one PDF inside a render worker and return the render time in seconds."""
+    from weasyprint import HTML
+
+    if _template is None:
+        _init_render_worker()
+
+    start = time.perf_counter()
+    html_content = _template.render(title=title, date=date, content=content)
+    HTML(string=html_content, base_url=str(templates_path)).write_pdf(
+        pdf_path, stylesheets=[_stylesheet], font_config=_font_config
+    )
+    return time.perf_counter() - start
+
+
+def _can_start_processes() -> bool:
+    # Celery prefork children are daemonic and may not start processes of their own
+    try:
+        from billiard.process import current_process as billiard_current_process
+        if billiard_current_process().daemon:
+            return False
+    except ImportError:
+        pass
+    return not multiprocessing.current_process().daemon
+
+
+class RendererBusy(Exception):
+    pass
+
+
+class PdfRenderer:
+    """
+    Renders PDFs off the event loop in a pool of warm WeasyPrint workers.
+
+    Each worker parses the template, stylesheet and fonts once. At most
+    `max_workers + max_queue` renders may be pending; beyond that callers get
+    RendererBusy instead of piling up behind long documents.
+    """
+
+    def __init__(self, max_workers: int = 2, max_queue: int = 8, use_processes: bool = True):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self._pid: Optional[int] = None
+        self._pending = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None or self._pid != os.getpid():
+            if self.use_processes and _can_start_processes():
+                # spawn: this process already runs an event loop thread, which fork would not copy safely
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_render_worker,
+                )
+            else:
+                if self.use_processes:
+                    logger.info("PDF process pool unavailable in a daemonic worker, rendering in threads")
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="pdf-render",
+                    initializer=_init_render_worker,
+                )
+            self._pid = os.getpid()
+        return self._executor
+
+    async def render(self, title: str, date: str, content: str, pdf_path: str) -> float:
+        if self._pending >= self.max_workers + self.max_queue:
+            raise RendererBusy("PDF renderer queue is full")
+
+        self._pending += 1
+        submitted = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            loop = asyncio.get_running_loop()
+            render_time = await loop.run_in_executor(executor, _render_pdf, title, date, content, pdf_path)
+        except BrokenExecutor:
+            # A render worker died (crash, OOM, failed initializer); the pool never recovers by itself
+            self._discard(executor)
+            raise
+        finally:
+            self._pending -= 1
+
+        total = time.perf_counter() - submitted
+        logger.info(
+            f"PDF rendered in {render_time * 1000:.0f}ms "
+            f"(queued {(total - render_time) * 1000:.0f}ms): {pdf_path}"
+        )
+        return render_time
+
+    def _discard(self, executor: Executor):
+        """Drop a broken pool so the next render starts a fresh one."""
+        if self._executor is not executor:
+            # Another render already replaced it
+            return
+        logger.error("PDF render pool is broken, replacing it")
+        executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._pid = None
+
+    def shutdown(self):
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._pid = None
@@ -0,0 +1,73 @@
+import hashlib
+import os
+import pathlib
+from functools import lru_cache
+from typing import Optional
+from uuid import uuid4
+from app.agents.tools.pdf_renderer import STYLESHEET_NAME, TEMPLATE_NAME, templates_path
+from app.core.database import SessionLocal
+from app.core.task_context import TaskContext
+from app.enums.files import FileType
+from app.models.generated_files import GeneratedFile
+
+
+root_path = pathlib.Path(__file__).parent.parent.parent.parent
+
+blob_path = root_path / "output" / "blobs"
+
+
+@lru_cache(maxsize=1)
+def _template_digest() -> str:
+    # Template and stylesheet are part of the rendered input, so editing them invalidates old blobs
+    digest = hashlib.sha256()
+    digest.update((templates_path / TEMPLATE_NAME).read_bytes())
+    digest.update((templates_path / STYLESHEET_NAME).read_bytes())
+    return digest.hexdigest()
+
+
+def content_digest(title: str, date: str, content: str) -> str:
+    """Hash everything the rendered HTML is built from."""
+    digest = hashlib.sha256(_template_digest().encode())
+    for part in (title, date, content):
+        digest.update(b"\0")
+        digest.update(part.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def path_for_digest(digest: str) -> pathlib.Path:
+    return blob_path / digest[:2] / f"{digest}.pdf"
+
+
+def existing_blob(digest: str) -> Optional[pathlib.Path]:
+    path = path_for_digest(digest)
+    return path if path.is_file() else None
+
+
+def temp_path_for(digest: str) -> pathlib.Path:
+    path = path_for_digest(digest)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path.with_name(f".{digest}.{uuid4().hex}.tmp")
+
+
+def commit_blob(tmp_path: pathlib.Path, digest: str) -> pathlib.Path:
+    # Atomic rename: readers never see a half-written PDF, and concurrent identical renders are harmless
+    path = path_for_digest(digest)
+    os.replace(tmp_path, path)
+    return path
+
+
+def record_generated_file(task: TaskContext, filename: str, path: pathlib.Path, title: str) -> str:
+    with SessionLocal() as db:
+        generated_file = GeneratedFile(
+            task_id=task.task_id,
+            user_id=task.user_id,
+            message_id=task.message_id,
+            filename=filename,
+            file_path=str(path),
+            file_type=FileType.PDF,
+            file_size=path.stat().st_size,
+            title=title,
+        )
+        db.add(generated_file)
+        db.commit()
+        return generated_file.id
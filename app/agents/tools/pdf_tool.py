@@ -1,20 +1,25 @@
-from weasyprint import HTML
-from jinja2 import Environment, FileSystemLoader
+from pydantic_ai import ModelRetry
+import asyncio
 import pathlib
+import time
+from app.core.config import CONFIG
 from app.core.logging import logger
+from app.core.metrics import ToolCall, observe_tool
+from app.agents.tools.pdf_renderer import PdfRenderer, RendererBusy
+from app.agents.tools import pdf_store
+from app.core.task_context import get_current_task
 from datetime import datetime, timezone
 
 
-root_path = pathlib.Path(__file__).parent.parent.parent.parent
+# Shared renderer: WeasyPrint runs in warm workers, off the agent's event loop
+pdf_renderer = PdfRenderer(
+    max_workers=CONFIG.PDF_RENDER_WORKERS,
+    max_queue=CONFIG.PDF_RENDER_QUEUE,
+    use_processes=CONFIG.PDF_RENDER_PROCESSES,
+)
 
-output_path = root_path / "output"
-templates_path = root_path / "templates"
 
-# Setup Jinja2 environment
-jinja_env = Environment(loader=FileSystemLoader(templates_path))
-
-
-def write_pdf(title: str, content: str, filename: str):
+async def write_pdf(title: str, content: str, filename: str):
     """
     Render a legal document PDF using the template.
 
@@ -24,7 +29,7 @@ def write_pdf(title: str, content: str, filename: str):
         filename (str): Name of the PDF file. Must end with .pdf.
 
     Returns:
-        str: Absolute path to the generated PDF file.
+        str: Download path of the generated PDF, or its absolute path outside of a task.
 
     Raises:
         ValueError: If required fields are empty.
@@ -41,16 +46,36 @@ def write_pdf(title: str, content: str, filename: str):
     if not filename.lower().endswith(".pdf"):
         raise ValueError("Filename must end with .pdf")
 
-    # Load and render template
-    template = jinja_env.get_template("legal_template.html")
-    html_content = template.render(title=title, date=date, content=content)
-
     safe_filename = pathlib.Path(filename).name
-    output_path.mkdir(parents=True, exist_ok=True)
 
-    pdf_path = output_path / safe_filename
+    async with observe_tool("write_pdf") as call:
+        return await _write_pdf(title, date, content, safe_filename, call)
+
+
+async def _write_pdf(title: str, date: str, content: str, safe_filename: str, call: ToolCall) -> str:
+    # Identical documents share one content-addressed blob and are only rendered once
+    digest = pdf_store.content_digest(title, date, content)
+    pdf_path = pdf_store.existing_blob(digest)
+    if pdf_path is not None:
+        logger.info(f"PDF already rendered, reusing {pdf_path}")
+    else:
+        tmp_path = pdf_store.temp_path_for(digest)
+        submitted = time.perf_counter()
+        try:
+            render_time = await pdf_renderer.render(title, date, content, str(tmp_path))
+            call.queue_seconds = time.perf_counter() - submitted - render_time
+        except RendererBusy as e:
+            raise ModelRetry(f"{e}, try again shortly")
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        pdf_path = pdf_store.commit_blob(tmp_path, digest)
+        logger.info(f"PDF generated: {pdf_path}")
+
+    task = get_current_task()
+    if task is None:
+        return str(pdf_path)
 
-    HTML(string=html_content).write_pdf(pdf_path)
+    file_id = await asyncio.to_thread(pdf_store.record_generated_file, task, safe_filename, pdf_path, title)
+    return f"/api/v1/files/{file_id}"
 
-    logger.info(f"PDF generated: {pdf_path}")
-    return str(pdf_path)
\ No newline at end of file
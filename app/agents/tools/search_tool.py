@@ -1,46 +1,214 @@
 from pydantic_ai.common_tools.duckduckgo import duckduckgo_search_tool
 from pydantic_ai import RunContext, Tool
+from collections import OrderedDict
+from typing import Optional
+from app.core.config import CONFIG
+from app.core.logging import logger
+from app.core.metrics import TOOL_RETRIES, SEARCH_CACHE_HITS, SEARCH_CACHE_MISSES, SEARCH_COALESCED, observe_tool
+from app.core.redis_client import get_async_redis
 import asyncio
+import json
 import random
+import re
+import time
 
 
-async def search_with_retry(
-    query: str,
-    max_results: int = 5,
-    max_retries: int = 3,
-    base_delay: float = 1.0
-) -> str:
-    """Search DuckDuckGo with exponential backoff retry logic."""
-    
-    # Get the original tool function
-    original_tool = duckduckgo_search_tool(max_results=max_results)
-    
+# One DuckDuckGo tool (and client) per result size, reused across searches
+_search_tools: dict[int, Tool] = {}
+
+# Searches currently on the wire, keyed like the cache, so identical queries share one request
+_in_flight: dict[str, asyncio.Future] = {}
+
+
+def get_search_tool(max_results: int) -> Tool:
+    tool = _search_tools.get(max_results)
+    if tool is None:
+        tool = _search_tools[max_results] = duckduckgo_search_tool(max_results=max_results)
+    return tool
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case, collapse whitespace and drop trailing punctuation so near-identical queries share a key."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!.").lower()
+
+
+class SearchCache:
+    """
+    TTL cache for search results.
+
+    An in-process LRU answers repeated queries within a worker; when enabled,
+    Redis shares results across workers.
+    """
+
+    def __init__(self, ttl: int, max_entries: int = 1024, use_redis: bool = False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.use_redis = use_redis
+        self._entries: OrderedDict[str, tuple[float, list]] = OrderedDict()
+
+    def key(self, query: str, max_results: int) -> str:
+        return f"search_cache:{max_results}:{normalize_query(query)}"
+
+    async def get(self, key: str) -> Optional[list]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, results = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                SEARCH_CACHE_HITS.labels("memory").inc()
+                return results
+            del self._entries[key]
+
+        if self.use_redis:
+            try:
+                cached = await get_async_redis().get(key)
+            except Exception as e:
+                logger.error(f"Search cache read failed: {e}")
+                cached = None
+            if cached is not None:
+                results = json.loads(cached)
+                self._remember(key, results)
+                SEARCH_CACHE_HITS.labels("redis").inc()
+                return results
+
+        SEARCH_CACHE_MISSES.inc()
+        return None
+
+    async def set(self, key: str, results: list):
+        self._remember(key, results)
+        if self.use_redis:
+            try:
+                await get_async_redis().set(key, json.dumps(results), ex=self.ttl)
+            except Exception as e:
+                logger.error(f"Search cache write failed: {e}")
+
+    def _remember(self, key: str, results: list):
+        self._entries[key] = (time.monotonic() + self.ttl, results)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+search_cache = SearchCache(
+    ttl=CONFIG.SEARCH_CACHE_TTL,
+    max_entries=CONFIG.SEARCH_CACHE_MAX_ENTRIES,
+    use_redis=CONFIG.SEARCH_CACHE_REDIS,
+)
+
+
+async def _search(key: str, query: str, max_results: int, max_retries: int, base_delay: float):
+    original_tool = get_search_tool(max_results)
+
     last_error = None
     for attempt in range(max_retries):
         try:
             # Call the underlying search
             result = await original_tool.function(query)
+            await search_cache.set(key, result)
             return result
-            
+
         except Exception as e:
             last_error = e
             if attempt < max_retries - 1:
                 # Exponential backoff with jitter
                 delay = base_delay * (2 ** attempt) + random.uniform(0, 1)
-                print(f"Search failed (attempt {attempt + 1}), retrying in {delay:.2f}s...")
+                # Counted on the shared search rather than per caller, identical queries share one search
+                TOOL_RETRIES.labels("web_search").inc()
+                logger.warning(f"Search failed (attempt {attempt + 1}): {e}; retrying in {delay:.2f}s...")
                 await asyncio.sleep(delay)
             else:
-                print(f"Search failed after {max_retries} attempts")
-    
+                logger.error(f"Search failed after {max_retries} attempts: {e}")
+
     return f"Search failed: {str(last_error)}"
 
 
+async def search_with_retry(
+    query: str,
+    max_results: int = 5,
+    max_retries: int = 3,
+    base_delay: float = 1.0
+) -> str:
+    """Search DuckDuckGo with caching, coalescing of identical queries and exponential backoff retry logic."""
+
+    key = search_cache.key(query, max_results)
+    cached = await search_cache.get(key)
+    if cached is not None:
+        return cached
+
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_search(key, query, max_results, max_retries, base_delay))
+        _in_flight[key] = task
+        task.add_done_callback(lambda _: _in_flight.pop(key, None))
+    else:
+        SEARCH_COALESCED.inc()
+
+    # Shield so one cancelled caller doesn't cancel the search for everyone waiting on it
+    return await asyncio.shield(task)
+
+
+async def search_many(
+    queries: list[str],
+    max_results: int = 5,
+    max_retries: int = 3,
+    max_concurrency: int = 4,
+    snippet_chars: int = 300
+) -> str:
+    """Run several searches concurrently and merge them into one digest with duplicate URLs removed."""
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def bounded(query: str):
+        async with semaphore:
+            return await search_with_retry(query, max_results, max_retries)
+
+    # Identical (normalised) queries in one batch only need to run once
+    unique = {}
+    for query in queries:
+        if query.strip():
+            unique.setdefault(normalize_query(query), query)
+    unique_queries = list(unique.values())
+    results = await asyncio.gather(*(bounded(q) for q in unique_queries))
+
+    seen_urls = set()
+    sections = []
+    for query, result in zip(unique_queries, results):
+        if isinstance(result, str):
+            sections.append(f"## {query}\n{result}")
+            continue
+        lines = []
+        for item in result:
+            href = item.get("href")
+            if href in seen_urls:
+                continue
+            seen_urls.add(href)
+            body = item.get("body", "")
+            if len(body) > snippet_chars:
+                body = body[:snippet_chars].rstrip() + "..."
+            lines.append(f"- {item.get('title', '')} ({href}): {body}")
+        sections.append(f"## {query}\n" + ("\n".join(lines) if lines else "No new results."))
+
+    return "\n\n".join(sections)
+
+
 # Create a custom tool wrapper
 def robust_search_tool(max_results: int = 5, max_retries: int = 3) -> Tool:
     """Returns a DuckDuckGo search tool with retry logic."""
-    
+
     async def search(ctx: RunContext, query: str) -> str:
         """Search DuckDuckGo for information."""
-        return await search_with_retry(query, max_results, max_retries)
-    
-    return Tool(search, name="web_search")
\ No newline at end of file
+        async with observe_tool("web_search"):
+            return await search_with_retry(query, max_results, max_retries)
+
+    return Tool(search, name="web_search")
+
+
+def robust_batch_search_tool(max_results: int = 5, max_retries: int = 3, max_concurrency: int = 4) -> Tool:
+    """Returns a tool that runs several DuckDuckGo searches concurrently and merges the results."""
+
+    async def search_batch(ctx: RunContext, queries: list[str]) -> str:
+        """Search DuckDuckGo for several independent queries at once. Prefer this over repeated web_search calls."""
+        async with observe_tool("web_search_many"):
+            return await search_many(queries, max_results, max_retries, max_concurrency)
+
+    return Tool(search_batch, name="web_search_many")
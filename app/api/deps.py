@@ -1,14 +1,13 @@
-from app.core.database import SessionLocal
+from app.core.database import AsyncSessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
 from redis.asyncio import Redis
 from fastapi import Request
+from typing import AsyncIterator
 
 
-def get_db():
-   db = SessionLocal()
-   try:
-       yield db
-   finally:
-       db.close()
+async def get_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
 
 
 
@@ -1,5 +1,6 @@
 import json
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from app.schemas.token import TokenData
@@ -7,7 +8,7 @@ from app.schemas.user import UserResponse
 from app.core.security import get_current_user
 from app.api.deps import get_db
 from app.models.users import User
-from app.scripts.hashing import verify_password
+from app.scripts.hashing import password_verifier
 from app.core.security import create_access_token
 from app.core.logging import logger
 from app.core.limiter import limiter
@@ -18,7 +19,7 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 @router.get("/me", response_model=UserResponse)
 @limiter.limit("5/minute")
-async def me(request: Request, current_user: TokenData = Depends(get_current_user), db: Session = Depends(get_db), redis: Redis = Depends(get_redis)):
+async def me(request: Request, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db), redis: Redis = Depends(get_redis)):
     # Try to get cached user data from Redis
     cached_user = await redis.get(f"user:{current_user.id}")
     if cached_user:
@@ -26,7 +27,7 @@ async def me(request: Request, current_user: TokenData = Depends(get_current_use
         return UserResponse(**json.loads(cached_user))
     
     # Fetch from database
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = await db.scalar(select(User).where(User.id == current_user.id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -39,13 +40,13 @@ async def me(request: Request, current_user: TokenData = Depends(get_current_use
 
 @router.post("/login")
 @limiter.limit("5/minute")
-async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username).first()
+async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.username == form_data.username))
     if not user:
         raise HTTPException(status_code=401, detail="Incorrect email or password")
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await password_verifier.verify(user.username, form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Incorrect email or password")
-    return {"access_token": create_access_token(data={"id": user.id, "role": user.role.value}), "token_type": "bearer"}
+    return {"access_token": create_access_token(data={"id": user.id, "role": user.role.value, "tier": user.subscription_tier.value}), "token_type": "bearer"}
 
 
     
\ No newline at end of file
@@ -0,0 +1,19 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, Request
+from app.schemas.token import TokenData
+from app.schemas.conversation import ConversationCreate, ConversationResponse
+from app.core.security import get_current_user
+from app.api.deps import get_db
+from app.models.conversations import Conversation
+from app.core.limiter import limiter
+
+router = APIRouter(prefix="/conversations", tags=["conversations"])
+
+
+@router.post("", response_model=ConversationResponse, status_code=201)
+@limiter.limit("30/minute")
+async def create_conversation(request: Request, body: ConversationCreate, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    conversation = Conversation(user_id=current_user.id, title=body.title)
+    db.add(conversation)
+    await db.commit()
+    return conversation
@@ -0,0 +1,38 @@
+import pathlib
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.schemas.token import TokenData
+from app.core.security import get_current_user
+from app.api.deps import get_db
+from app.models.generated_files import GeneratedFile
+from app.enums.users import UserRole
+from app.core.limiter import limiter
+
+router = APIRouter(prefix="/files", tags=["files"])
+
+
+@router.get("/{file_id}")
+@limiter.limit("30/minute")
+async def download_file(request: Request, file_id: str, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    generated_file = await db.scalar(select(GeneratedFile).where(GeneratedFile.id == file_id))
+    if not generated_file or (generated_file.user_id != current_user.id and current_user.role != UserRole.ADMIN.value):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    path = pathlib.Path(generated_file.file_path)
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # Blobs are content-addressed, so the digest in the blob name is a strong ETag
+    etag = f'"{path.stem}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    # FileResponse handles Range/If-Range and uses the server's zero-copy pathsend extension when offered
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=generated_file.filename,
+        headers={"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable"},
+    )
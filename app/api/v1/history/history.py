@@ -0,0 +1,151 @@
+import base64
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Optional
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from app.schemas.token import TokenData
+from app.schemas.history import (
+    FileHistoryItem,
+    FileHistoryPage,
+    MessageHistoryItem,
+    MessageHistoryPage,
+    TaskHistoryItem,
+    TaskHistoryPage,
+)
+from app.core.security import get_current_user
+from app.core.database import AsyncSessionLocal
+from app.api.deps import get_db
+from app.models.messages import Message
+from app.models.agent_tasks import AgentTask
+from app.models.generated_files import GeneratedFile
+from app.core.limiter import limiter
+
+router = APIRouter(prefix="/history", tags=["history"])
+
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+EXPORT_CHUNK_SIZE = 500
+
+
+class HistoryKind(str, Enum):
+    MESSAGES = "messages"
+    TASKS = "tasks"
+    FILES = "files"
+
+
+# Only the columns each listing needs, so large result/trace columns are never loaded
+HISTORY_SOURCES = {
+    HistoryKind.MESSAGES: (
+        Message,
+        (Message.id, Message.role, Message.content, Message.conversation_id, Message.created_at),
+        MessageHistoryItem,
+    ),
+    HistoryKind.TASKS: (
+        AgentTask,
+        (AgentTask.id, AgentTask.status, AgentTask.prompt, AgentTask.message_id, AgentTask.created_at, AgentTask.finished_at),
+        TaskHistoryItem,
+    ),
+    HistoryKind.FILES: (
+        GeneratedFile,
+        (
+            GeneratedFile.id,
+            GeneratedFile.filename,
+            GeneratedFile.title,
+            GeneratedFile.file_type,
+            GeneratedFile.file_size,
+            GeneratedFile.task_id,
+            GeneratedFile.created_at,
+        ),
+        FileHistoryItem,
+    ),
+}
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def history_query(kind: HistoryKind, user_id: str, after: Optional[tuple[datetime, str]], limit: int, conversation_id: Optional[str] = None):
+    """Newest first; rows strictly older than the cursor, served by the (user_id, created_at, id) index."""
+    model, columns, _ = HISTORY_SOURCES[kind]
+    query = select(*columns).where(model.user_id == user_id)
+    if conversation_id is not None:
+        query = query.where(model.conversation_id == conversation_id)
+    if after is not None:
+        created_at, row_id = after
+        query = query.where(or_(model.created_at < created_at, and_(model.created_at == created_at, model.id < row_id)))
+    return query.order_by(model.created_at.desc(), model.id.desc()).limit(limit)
+
+
+def to_item(kind: HistoryKind, row) -> BaseModel:
+    _, _, item = HISTORY_SOURCES[kind]
+    data = dict(row)
+    if kind == HistoryKind.FILES:
+        data["url"] = f"/api/v1/files/{data['id']}"
+    return item(**data)
+
+
+async def read_page(db: AsyncSession, kind: HistoryKind, user_id: str, cursor: Optional[str], limit: int, conversation_id: Optional[str] = None) -> dict:
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether there is a next page without a COUNT
+    rows = (await db.execute(history_query(kind, user_id, after, limit + 1, conversation_id))).mappings().all()
+    items = [to_item(kind, row) for row in rows[:limit]]
+    next_cursor = encode_cursor(rows[limit - 1]["created_at"], rows[limit - 1]["id"]) if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/messages", response_model=MessageHistoryPage)
+@limiter.limit("60/minute")
+async def list_messages(request: Request, cursor: Optional[str] = None, limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), conversation_id: Optional[str] = None, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await read_page(db, HistoryKind.MESSAGES, current_user.id, cursor, limit, conversation_id)
+
+
+@router.get("/tasks", response_model=TaskHistoryPage)
+@limiter.limit("60/minute")
+async def list_tasks(request: Request, cursor: Optional[str] = None, limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await read_page(db, HistoryKind.TASKS, current_user.id, cursor, limit)
+
+
+@router.get("/files", response_model=FileHistoryPage)
+@limiter.limit("60/minute")
+async def list_files(request: Request, cursor: Optional[str] = None, limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    return await read_page(db, HistoryKind.FILES, current_user.id, cursor, limit)
+
+
+async def export_rows(kind: HistoryKind, user_id: str) -> AsyncIterator[str]:
+    # The export outlives the request's dependencies, so it opens its own session
+    async with AsyncSessionLocal() as db:
+        after = None
+        while True:
+            rows = (await db.execute(history_query(kind, user_id, after, EXPORT_CHUNK_SIZE))).mappings().all()
+            if not rows:
+                return
+            yield "".join(to_item(kind, row).model_dump_json() + "\n" for row in rows)
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                return
+            after = (rows[-1]["created_at"], rows[-1]["id"])
+
+
+@router.get("/{kind}/export", description="Stream the whole history as newline-delimited JSON, newest first")
+@limiter.limit("5/minute")
+async def export_history(request: Request, kind: HistoryKind, current_user: TokenData = Depends(get_current_user)):
+    return StreamingResponse(
+        export_rows(kind, current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{kind.value}.ndjson"'},
+    )
@@ -1,7 +1,13 @@
 from fastapi import APIRouter
 from app.api.v1.auth.auth import router as auth_router
+from app.api.v1.files.files import router as files_router
+from app.api.v1.history.history import router as history_router
+from app.api.v1.conversations.conversations import router as conversations_router
 
 
 router = APIRouter(prefix="/api/v1")
 
-router.include_router(auth_router)
\ No newline at end of file
+router.include_router(auth_router)
+router.include_router(files_router)
+router.include_router(history_router)
+router.include_router(conversations_router)
\ No newline at end of file
@@ -0,0 +1,13 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+
+config_path = Path(__file__).parent.parent.parent / "config" / "config.json"
+
+
+@lru_cache(maxsize=1)
+def load_agent_config() -> dict:
+    """Per-agent settings and model pricing from config/config.json, read once per process."""
+    with open(config_path, "r") as f:
+        return json.load(f)
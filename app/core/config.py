@@ -10,9 +10,45 @@ class Settings(BaseSettings):
     ADMIN_PASSWORD: str
     ADMIN_EMAIL: str
     DB_URL: str
-    REDIS_HOST: str
-    REDIS_PORT: str
     REDIS_URL: str
+    # Unused: every client connects through REDIS_URL. Still accepted so older .env files load
+    REDIS_HOST: str | None = None
+    REDIS_PORT: str | None = None
+    AGENT_MAX_CONCURRENCY: int = 8
+    AGENT_RUN_TIMEOUT: int = 600
+    TASK_EVENTS_MAXLEN: int = 10_000
+    TASK_EVENTS_TTL: int = 3600
+    TASK_TRACE_MAX_EVENTS: int = 500
+    TASK_STATUS_CACHE_TTL: int = 3600
+    TASK_STATUS_CACHE_ACTIVE_TTL: int = 5
+    SEARCH_CACHE_TTL: int = 600
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024
+    SEARCH_CACHE_REDIS: bool = False
+    PDF_RENDER_WORKERS: int = 2
+    PDF_RENDER_QUEUE: int = 8
+    PDF_RENDER_PROCESSES: bool = True
+    BATCH_MAX_PROMPTS: int = 200
+    ASYNC_DB_URL: str | None = None
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE: int = 1800
+    DB_CREATE_TABLES: bool = True
+    PASSWORD_VERIFY_WORKERS: int = 4
+    PASSWORD_VERIFY_CACHE_TTL: int = 0
+    PASSWORD_VERIFY_CACHE_SIZE: int = 1024
+    JWT_BACKEND: str = "jose"
+    TOKEN_CACHE_SIZE: int = 1024
+    RATE_LIMIT_STORAGE_URI: str | None = None
+    WORKER_TIER: str | None = None
+    WORKER_METRICS_PORT: int | None = None
+    CELERY_SERIALIZER: str = "json"
+    CELERY_COMPRESSION: str = "zlib"
+    CELERY_COMPRESSION_THRESHOLD: int = 1024
+    CELERY_RESULT_EXPIRES: int = 86400
+    CELERY_RESULT_MODE: str = "full"
+    CONVERSATION_TOKEN_BUDGET: int = 4000
+    CONVERSATION_SUMMARY_TOKENS: int = 500
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -1,16 +1,43 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.core.config import CONFIG
 
 SQLALCHEMY_DATABASE_URL = CONFIG.DB_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# Async drivers for the API process; Celery workers keep the sync engine
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
+def get_async_url(url: str) -> str:
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
 
+def pool_kwargs(url: str) -> dict:
+    kwargs = {"pool_pre_ping": CONFIG.DB_POOL_PRE_PING, "pool_recycle": CONFIG.DB_POOL_RECYCLE}
+    # SQLite uses its own single-file pools, which don't take size settings
+    if make_url(url).get_backend_name() != "sqlite":
+        kwargs.update(pool_size=CONFIG.DB_POOL_SIZE, max_overflow=CONFIG.DB_MAX_OVERFLOW)
+    return kwargs
 
 
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **pool_kwargs(SQLALCHEMY_DATABASE_URL))
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_SQLALCHEMY_DATABASE_URL = CONFIG.ASYNC_DB_URL or get_async_url(SQLALCHEMY_DATABASE_URL)
+
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **pool_kwargs(ASYNC_SQLALCHEMY_DATABASE_URL))
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Optional, TypeVar
+from app.core.logging import logger
+
+T = TypeVar("T")
+
+
+class WorkerLoop:
+    """
+    A long-lived event loop running in a daemon thread.
+
+    Celery tasks are synchronous, so each task hands its coroutine to this loop and
+    blocks on the result. Async clients (OpenRouter, DuckDuckGo, Redis) created on
+    the loop keep their connections and TLS sessions across tasks, and when the
+    worker runs with a thread pool several tasks share the loop concurrently.
+    """
+
+    def __init__(self, max_concurrency: int = 8, name: str = "worker-loop"):
+        self.max_concurrency = max_concurrency
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        with self._lock:
+            if self.running:
+                return
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run_forever, name=self.name, daemon=True)
+            self._thread.start()
+            self._ready.wait()
+            logger.info(f"[{self.name}] Event loop started (max {self.max_concurrency} concurrent runs)")
+
+    def _run_forever(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    async def _limited(self, coro: Awaitable[T]) -> T:
+        async with self._semaphore:
+            return await coro
+
+    def submit(self, coro: Awaitable[T]) -> Future:
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(self._limited(coro), self._loop)
+
+    def run(self, coro: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """Run a coroutine on the loop and block the calling thread until it finishes."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self):
+        with self._lock:
+            if not self.running:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+            self._loop = None
+            logger.info(f"[{self.name}] Event loop stopped")
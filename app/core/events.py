@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, AsyncIterable, Optional
+from redis.asyncio import Redis
+from app.core.config import CONFIG
+from app.core.logging import logger
+from app.core.redis_client import get_async_redis
+
+if TYPE_CHECKING:
+    from pydantic_ai import RunContext
+    from pydantic_ai.messages import AgentStreamEvent
+
+_current_publisher: ContextVar[Optional["TaskEventPublisher"]] = ContextVar("task_event_publisher", default=None)
+
+
+def task_stream_key(task_id: str) -> str:
+    return f"task:{task_id}:events"
+
+
+def get_publisher() -> Optional["TaskEventPublisher"]:
+    return _current_publisher.get()
+
+
+class TaskEventPublisher:
+    """
+    Publishes the progress of one agent task to a Redis stream.
+
+    Streams (rather than pub/sub) let a client that connects late, or reconnects
+    with Last-Event-ID, replay what it missed. The stream is trimmed and expires
+    on its own once the task is done. When given a trace list, every event except
+    streamed tokens is also appended to it so the worker can persist the run's trace.
+    """
+
+    def __init__(self, redis: Redis, task_id: str, trace: Optional[list] = None):
+        self.redis = redis
+        self.task_id = task_id
+        self.key = task_stream_key(task_id)
+        self.trace = trace
+        self._started = time.perf_counter()
+
+    def _record(self, event: str, data: dict):
+        if self.trace is None or event == "token" or len(self.trace) >= CONFIG.TASK_TRACE_MAX_EVENTS:
+            return
+        # The final result is persisted on its own column
+        data = {key: value for key, value in data.items() if key != "result"}
+        self.trace.append({"event": event, "elapsed": round(time.perf_counter() - self._started, 3), **data})
+
+    async def publish(self, event: str, **data):
+        self._record(event, data)
+        try:
+            await self.redis.xadd(
+                self.key,
+                {"event": event, "data": json.dumps(data, default=str)},
+                maxlen=CONFIG.TASK_EVENTS_MAXLEN,
+                approximate=True,
+            )
+        except Exception as e:
+            # Streaming is best-effort; it must never fail the run itself
+            logger.error(f"[{self.task_id}] Failed to publish {event} event: {e}")
+
+    async def expire(self):
+        try:
+            await self.redis.expire(self.key, CONFIG.TASK_EVENTS_TTL)
+        except Exception as e:
+            logger.error(f"[{self.task_id}] Failed to expire event stream: {e}")
+
+    def stream_handler(self, agent_name: str):
+        """Build a pydantic_ai event_stream_handler that forwards one agent's events."""
+        # Imported here so the API, which only reads the streams, doesn't load pydantic_ai
+        from pydantic_ai.messages import (
+            FunctionToolCallEvent,
+            FunctionToolResultEvent,
+            PartDeltaEvent,
+            PartStartEvent,
+            TextPart,
+            TextPartDelta,
+        )
+
+        async def handler(ctx: "RunContext", events: AsyncIterable["AgentStreamEvent"]):
+            async for event in events:
+                if isinstance(event, PartStartEvent) and isinstance(event.part, TextPart) and event.part.content:
+                    await self.publish("token", agent=agent_name, delta=event.part.content)
+                elif isinstance(event, PartDeltaEvent) and isinstance(event.delta, TextPartDelta):
+                    await self.publish("token", agent=agent_name, delta=event.delta.content_delta)
+                elif isinstance(event, FunctionToolCallEvent):
+                    await self.publish(
+                        "tool_call",
+                        agent=agent_name,
+                        tool=event.part.tool_name,
+                        tool_call_id=event.part.tool_call_id,
+                        args=event.part.args,
+                    )
+                elif isinstance(event, FunctionToolResultEvent):
+                    await self.publish(
+                        "tool_result",
+                        agent=agent_name,
+                        tool=event.part.tool_name,
+                        tool_call_id=event.part.tool_call_id,
+                    )
+
+        return handler
+
+
+@asynccontextmanager
+async def task_events(task_id: str, trace: Optional[list] = None):
+    """Publish RUNNING/final events around a run and expose the publisher to every agent in it."""
+    publisher = TaskEventPublisher(get_async_redis(), task_id, trace)
+    token = _current_publisher.set(publisher)
+    await publisher.publish("state", state="RUNNING")
+    try:
+        yield publisher
+    except Exception as e:
+        await publisher.publish("final", state="FAILURE", error=str(e))
+        raise
+    except asyncio.CancelledError:
+        # WorkerLoop cancels runs that exceed AGENT_RUN_TIMEOUT
+        await publisher.publish("final", state="FAILURE", error="Agent run timed out or was cancelled")
+        raise
+    finally:
+        _current_publisher.reset(token)
+        await publisher.expire()
@@ -1,5 +1,132 @@
+import time
+from fastapi import HTTPException, Request
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from app.core.config import CONFIG
+from app.core.logging import logger
+from app.core.security import verify_access_token
+from app.enums.subscription import SubscriptionTier, SUBSCRIPTION_RATE_LIMITS, SUBSCRIPTION_CONCURRENT_TASKS
+from app.tasks.routing import max_queue_wait
 
 
-limiter = Limiter(key_func=get_remote_address)
\ No newline at end of file
+def get_tier(value: str) -> SubscriptionTier:
+    try:
+        return SubscriptionTier(value)
+    except ValueError:
+        return SubscriptionTier.FREE
+
+
+def get_rate_limit_key(request: Request) -> str:
+    """Key limits on the authenticated user (prefixed with their tier), falling back to the client address."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        try:
+            user = verify_access_token(token, HTTPException(status_code=401))
+            return f"{user.tier}:{user.id}"
+        except HTTPException:
+            pass
+    return f"ip:{get_remote_address(request)}"
+
+
+def tier_limit(key: str) -> str:
+    """Dynamic slowapi limit: the quota of the tier encoded in the rate-limit key."""
+    return SUBSCRIPTION_RATE_LIMITS[get_tier(key.split(":", 1)[0])]
+
+
+# Counters live in Redis (sliding window, updated by Lua) so every API worker shares them
+limiter = Limiter(
+    key_func=get_rate_limit_key,
+    storage_uri=CONFIG.RATE_LIMIT_STORAGE_URI or CONFIG.REDIS_URL,
+    strategy="moving-window",
+    in_memory_fallback_enabled=True,
+)
+
+
+# KEYS[1] slot set; ARGV: now, hold seconds, cap, task ids...
+ACQUIRE_SLOTS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local hold = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+local requested = #ARGV - 3
+if redis.call('ZCARD', KEYS[1]) + requested > tonumber(ARGV[3]) then
+    return 0
+end
+for i = 4, #ARGV do
+    redis.call('ZADD', KEYS[1], now + hold, ARGV[i])
+end
+if redis.call('TTL', KEYS[1]) < hold then
+    redis.call('EXPIRE', KEYS[1], hold)
+end
+return 1
+"""
+
+# KEYS[1] slot set; ARGV: now, hold seconds, task id
+HOLD_SLOT_SCRIPT = """
+local hold = tonumber(ARGV[2])
+redis.call('ZADD', KEYS[1], tonumber(ARGV[1]) + hold, ARGV[3])
+if redis.call('TTL', KEYS[1]) < hold then
+    redis.call('EXPIRE', KEYS[1], hold)
+end
+return 1
+"""
+
+# Extra time past the worst-case queue wait or run before a slot is reclaimed
+SLOT_GRACE_SECONDS = 300
+
+
+class TaskSlots:
+    """
+    Caps how many agent tasks one user can have queued or running.
+
+    Each task holds a slot (a member of a per-user sorted set scored by the time
+    it may be reclaimed) from submission until the worker finishes it. A queued
+    task is held for the tier's longest queue wait plus the run timeout; when a
+    worker starts it the hold is reset to the run timeout. Expired slots are
+    reclaimed so a crashed worker or a lost message can't lock a user out.
+    """
+
+    def __init__(self, run_timeout: int, grace: int = SLOT_GRACE_SECONDS):
+        self.run_hold = run_timeout + grace
+
+    def queued_hold(self, tier: str) -> int:
+        return int(max_queue_wait(tier)) + self.run_hold
+
+    def key(self, user_id: str) -> str:
+        return f"task_slots:{user_id}"
+
+    def cap(self, tier: str) -> int:
+        return SUBSCRIPTION_CONCURRENT_TASKS[get_tier(tier)]
+
+    async def acquire(self, redis: Redis, user_id: str, tier: str, task_ids: list[str]) -> bool:
+        acquired = await redis.eval(
+            ACQUIRE_SLOTS_SCRIPT, 1, self.key(user_id), time.time(), self.queued_hold(tier), self.cap(tier), *task_ids
+        )
+        return bool(acquired)
+
+    async def acquire_or_raise(self, redis: Redis, user_id: str, tier: str, task_ids: list[str]):
+        if not await self.acquire(redis, user_id, tier, task_ids):
+            raise HTTPException(
+                status_code=429,
+                detail=f"Too many agent tasks in progress (limit {self.cap(tier)} for the {get_tier(tier).value} tier)",
+            )
+
+    def hold_running(self, redis: SyncRedis, user_id: str, task_id: str):
+        """Called when a worker starts the task: from now on it only needs the run timeout."""
+        try:
+            redis.eval(HOLD_SLOT_SCRIPT, 1, self.key(user_id), time.time(), self.run_hold, task_id)
+        except Exception as e:
+            logger.error(f"Failed to refresh task slot for {user_id}: {e}")
+
+    async def release_async(self, redis: Redis, user_id: str, task_ids: list[str]):
+        await redis.zrem(self.key(user_id), *task_ids)
+
+    def release(self, redis: SyncRedis, user_id: str, task_id: str):
+        try:
+            redis.zrem(self.key(user_id), task_id)
+        except Exception as e:
+            logger.error(f"Failed to release task slot for {user_id}: {e}")
+
+
+task_slots = TaskSlots(run_timeout=CONFIG.AGENT_RUN_TIMEOUT)
@@ -0,0 +1,256 @@
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from prometheus_client import CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+from app.core.agent_config import load_agent_config
+from app.core.logging import logger
+from app.core.task_context import get_current_task
+
+
+# Agent runs and tool calls range from milliseconds (cache hits) to minutes (delegations)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+MODEL_CALL_SECONDS = Histogram(
+    "agent_model_call_seconds", "Wall time of one model request", ["agent", "model"], buckets=LATENCY_BUCKETS
+)
+MODEL_TOKENS = Counter(
+    "agent_model_tokens_total", "Tokens reported by the provider", ["agent", "model", "kind"]
+)
+MODEL_COST = Counter(
+    "agent_model_cost_usd_total", "Estimated model cost from config model_pricing", ["agent", "model"]
+)
+AGENT_RUN_SECONDS = Histogram(
+    "agent_run_seconds", "Wall time of one agent run, retries included", ["agent", "outcome"], buckets=LATENCY_BUCKETS
+)
+AGENT_RETRIES = Counter("agent_retries_total", "Agent runs retried after a model error", ["agent"])
+TOOL_CALL_SECONDS = Histogram(
+    "agent_tool_call_seconds", "Wall time of one tool call, queueing included", ["tool", "outcome"], buckets=LATENCY_BUCKETS
+)
+TOOL_QUEUE_SECONDS = Histogram(
+    "agent_tool_queue_seconds", "Time a tool call waited for a worker or concurrency slot", ["tool"], buckets=LATENCY_BUCKETS
+)
+TOOL_RETRIES = Counter("agent_tool_retries_total", "Tool attempts retried inside a tool call", ["tool"])
+MODEL_FAILOVERS = Counter("agent_model_failovers_total", "Model requests that failed and moved on to the next model", ["agent", "model"])
+MODEL_HEDGES = Counter("agent_model_hedges_total", "Requests hedged because the current model was slow to answer", ["agent"])
+TOOL_OUTPUT_TOKENS = Counter(
+    "agent_tool_output_tokens_total", "Estimated tokens of tool outputs before (raw) and after (compacted) compaction", ["agent", "tool", "kind"]
+)
+RESPONSE_CACHE_HITS = Counter(
+    "agent_response_cache_hits_total", "Agent replies served from the response cache", ["agent", "tier"]
+)
+RESPONSE_CACHE_MISSES = Counter("agent_response_cache_misses_total", "Response cache lookups that found nothing", ["agent"])
+SEARCH_CACHE_HITS = Counter("agent_search_cache_hits_total", "Searches answered from the search cache", ["tier"])
+SEARCH_CACHE_MISSES = Counter("agent_search_cache_misses_total", "Search cache lookups that found nothing")
+SEARCH_COALESCED = Counter("agent_search_coalesced_total", "Searches that joined an identical search already in flight")
+PASSWORD_VERIFY_QUEUE_SECONDS = Histogram(
+    "password_verify_queue_seconds", "Time a login waited for a bcrypt worker",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+PASSWORD_VERIFY_CACHE_HITS = Counter("password_verify_cache_hits_total", "Logins verified from the password cache without bcrypt")
+
+
+def _model_pricing() -> dict:
+    return load_agent_config().get("model_pricing", {})
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0, cache_write_tokens: int = 0) -> float:
+    """
+    USD cost from the per-million-token prices in config model_pricing (0 for unknown models).
+
+    input_tokens includes the cached ones; cache reads and writes are billed at the
+    optional "cache_read" / "cache_write" prices, defaulting to the input price.
+    """
+    pricing = _model_pricing().get(model)
+    if not pricing:
+        return 0.0
+    input_price = pricing.get("input", 0.0)
+    uncached_tokens = max(input_tokens - cache_read_tokens - cache_write_tokens, 0)
+    return (
+        uncached_tokens * input_price
+        + cache_read_tokens * pricing.get("cache_read", input_price)
+        + cache_write_tokens * pricing.get("cache_write", input_price)
+        + output_tokens * pricing.get("output", 0.0)
+    ) / 1_000_000
+
+
+class TaskMetrics:
+    """
+    Per-task totals for the summary stored on AgentTask.metrics.
+
+    Agent runs share one event loop, so parallel tool calls of the same task may
+    record concurrently from different coroutines; a lock keeps it safe from threads too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.agents: dict[str, dict] = {}
+        self.models: dict[str, dict] = {}
+        self.tools: dict[str, dict] = {}
+
+    @staticmethod
+    def _add(bucket: dict, name: str, **values):
+        entry = bucket.setdefault(name, {})
+        for key, value in values.items():
+            entry[key] = entry.get(key, 0) + value
+        return entry
+
+    def add_agent_run(self, agent: str, seconds: float, retries: int):
+        with self._lock:
+            entry = self._add(self.agents, agent, runs=1, seconds=seconds, retries=retries)
+            entry["max_seconds"] = max(entry.get("max_seconds", 0.0), seconds)
+
+    def add_model_call(
+        self, agent: str, model: str, seconds: float, input_tokens: int, output_tokens: int, cost: float,
+        cache_read_tokens: int = 0, cache_write_tokens: int = 0,
+    ):
+        with self._lock:
+            self._add(
+                self.models, f"{agent}/{model}",
+                calls=1, seconds=seconds, input_tokens=input_tokens, output_tokens=output_tokens, cost_usd=cost,
+                cache_read_tokens=cache_read_tokens, cache_write_tokens=cache_write_tokens,
+            )
+
+    def add_tool_call(self, tool: str, seconds: float, queue_seconds: float, retries: int, failed: bool):
+        with self._lock:
+            entry = self._add(
+                self.tools, tool, calls=1, seconds=seconds, queue_seconds=queue_seconds, retries=retries, errors=int(failed)
+            )
+            entry["max_seconds"] = max(entry.get("max_seconds", 0.0), seconds)
+
+    def summary(self) -> dict:
+        with self._lock:
+            def rounded(bucket):
+                return {
+                    name: {key: round(value, 6) if isinstance(value, float) else value for key, value in entry.items()}
+                    for name, entry in bucket.items()
+                }
+            models = rounded(self.models)
+            return {
+                "agents": rounded(self.agents),
+                "models": models,
+                "tools": rounded(self.tools),
+                "totals": {
+                    "model_calls": sum(entry["calls"] for entry in models.values()),
+                    "input_tokens": sum(entry["input_tokens"] for entry in models.values()),
+                    "cache_read_tokens": sum(entry["cache_read_tokens"] for entry in models.values()),
+                    "cache_write_tokens": sum(entry["cache_write_tokens"] for entry in models.values()),
+                    "output_tokens": sum(entry["output_tokens"] for entry in models.values()),
+                    "cost_usd": round(sum(entry["cost_usd"] for entry in models.values()), 6),
+                },
+            }
+
+
+def _task_metrics() -> Optional[TaskMetrics]:
+    task = get_current_task()
+    return task.metrics if task is not None else None
+
+
+def record_model_call(agent: str, model: str, seconds: float, usage) -> dict:
+    """Record one model request; returns its token counts and cost."""
+    input_tokens = usage.input_tokens or 0
+    output_tokens = usage.output_tokens or 0
+    # Provider prompt cache: reads are the part of input_tokens served from cache, writes the part stored
+    cache_read_tokens = usage.cache_read_tokens or 0
+    cache_write_tokens = usage.cache_write_tokens or 0
+    cost = estimate_cost(model, input_tokens, output_tokens, cache_read_tokens, cache_write_tokens)
+    MODEL_CALL_SECONDS.labels(agent, model).observe(seconds)
+    MODEL_TOKENS.labels(agent, model, "input").inc(input_tokens)
+    MODEL_TOKENS.labels(agent, model, "output").inc(output_tokens)
+    MODEL_TOKENS.labels(agent, model, "cache_read").inc(cache_read_tokens)
+    MODEL_TOKENS.labels(agent, model, "cache_write").inc(cache_write_tokens)
+    MODEL_COST.labels(agent, model).inc(cost)
+    metrics = _task_metrics()
+    if metrics is not None:
+        metrics.add_model_call(agent, model, seconds, input_tokens, output_tokens, cost, cache_read_tokens, cache_write_tokens)
+    return {
+        "input_tokens": input_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "cache_write_tokens": cache_write_tokens,
+        "output_tokens": output_tokens,
+        "cost_usd": round(cost, 6),
+    }
+
+
+def record_agent_run(agent: str, seconds: float, retries: int, failed: bool):
+    AGENT_RUN_SECONDS.labels(agent, "error" if failed else "ok").observe(seconds)
+    if retries:
+        AGENT_RETRIES.labels(agent).inc(retries)
+    metrics = _task_metrics()
+    if metrics is not None:
+        metrics.add_agent_run(agent, seconds, retries)
+
+
+class ToolCall:
+    """Mutable record a tool fills in while observe_tool times it."""
+
+    def __init__(self):
+        self.queue_seconds = 0.0
+        self.retries = 0
+
+
+@asynccontextmanager
+async def observe_tool(tool: str):
+    """Time a tool call; the tool may set queue_seconds and retries on the yielded record."""
+    call = ToolCall()
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield call
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        TOOL_CALL_SECONDS.labels(tool, "error" if failed else "ok").observe(seconds)
+        TOOL_QUEUE_SECONDS.labels(tool).observe(call.queue_seconds)
+        if call.retries:
+            TOOL_RETRIES.labels(tool).inc(call.retries)
+        metrics = _task_metrics()
+        if metrics is not None:
+            metrics.add_tool_call(tool, seconds, call.queue_seconds, call.retries, failed)
+
+
+def _registry() -> CollectorRegistry:
+    """The registry to expose: every process's metrics when PROMETHEUS_MULTIPROC_DIR is set, else this process's."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_payload() -> bytes:
+    """Exposition text for /metrics, aggregated across processes when PROMETHEUS_MULTIPROC_DIR is set."""
+    return generate_latest(_registry())
+
+
+def start_metrics_server(port: Optional[int], multiprocess_pool: bool = False):
+    """
+    Serve /metrics from the main worker process on its own port.
+
+    Prefork children record metrics in their own memory, so with a multiprocess
+    pool they are only visible through PROMETHEUS_MULTIPROC_DIR.
+    """
+    if not port:
+        return
+    from prometheus_client import start_http_server
+
+    if multiprocess_pool and not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        logger.warning("Worker metrics server only sees the main process; set PROMETHEUS_MULTIPROC_DIR to include pool processes")
+    try:
+        start_http_server(port, registry=_registry())
+        logger.info(f"Worker metrics served on port {port}")
+    except OSError as e:
+        logger.error(f"Worker metrics server not started on port {port}: {e}")
+
+
+def mark_process_dead(pid: int):
+    """Drop a finished pool process's live gauges from the multiprocess metrics directory."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,29 @@
+from typing import Optional
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from app.core.config import CONFIG
+
+_redis: Optional[Redis] = None
+_sync_redis: Optional[SyncRedis] = None
+
+
+def get_async_redis() -> Redis:
+    """
+    Shared async Redis client on REDIS_URL (the Celery broker).
+
+    Created lazily on first use so its connection pool belongs to the event loop
+    that uses it: the worker's long-lived loop, or the API's loop when reading
+    broker queues.
+    """
+    global _redis
+    if _redis is None:
+        _redis = Redis.from_url(CONFIG.REDIS_URL, decode_responses=True)
+    return _redis
+
+
+def get_sync_redis() -> SyncRedis:
+    """Shared blocking Redis client for code running directly in Celery task threads."""
+    global _sync_redis
+    if _sync_redis is None:
+        _sync_redis = SyncRedis.from_url(CONFIG.REDIS_URL, decode_responses=True)
+    return _sync_redis
@@ -4,6 +4,11 @@ from app.core.config import CONFIG
 from fastapi.security.oauth2 import OAuth2PasswordBearer
 from datetime import datetime, timedelta, timezone
 from app.schemas.token import TokenData
+from app.enums.subscription import SubscriptionTier
+from collections import OrderedDict
+import hashlib
+import threading
+import time
 
 oauth2scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
@@ -15,16 +20,95 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, CONFIG.SECRET_KEY, algorithm=CONFIG.ALGORITHM)
     return encoded_jwt    
 
+
+def _jose_decode(token: str) -> dict:
+    return jwt.decode(token, CONFIG.SECRET_KEY, algorithms=[CONFIG.ALGORITHM])
+
+
+def _pyjwt_decoder():
+    # PyJWT is optional; it decodes noticeably faster than python-jose
+    try:
+        import jwt as pyjwt
+    except ImportError:
+        raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package: pip install pyjwt")
+
+    def decode(token: str) -> dict:
+        try:
+            return pyjwt.decode(token, CONFIG.SECRET_KEY, algorithms=[CONFIG.ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+
+    return decode
+
+
+JWT_DECODERS = {
+    "jose": lambda: _jose_decode,
+    "pyjwt": _pyjwt_decoder,
+}
+
+decode_token = JWT_DECODERS[CONFIG.JWT_BACKEND]()
+
+
+class TokenCache:
+    """
+    Bounded LRU of already-verified tokens, keyed by a hash of the token.
+
+    Entries are dropped once the token's `exp` has passed, so a cached token is
+    never accepted for longer than the signature check would have allowed.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, TokenData]] = OrderedDict()
+        # get_current_user is a sync dependency, so lookups run on threadpool threads
+        self._lock = threading.Lock()
+
+    def key(self, token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, token_data = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return token_data
+
+    def set(self, key: str, expires_at: float, token_data: TokenData):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, token_data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+token_cache = TokenCache(max_size=CONFIG.TOKEN_CACHE_SIZE)
+
+
 def verify_access_token(token: str, credential_exception: HTTPException) -> TokenData:
+    key = token_cache.key(token)
+    cached = token_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
-        payload = jwt.decode(token, CONFIG.SECRET_KEY, algorithms=[CONFIG.ALGORITHM])
+        payload = decode_token(token)
         id = payload.get("id")
         role = payload.get("role")
 
         if id is None or role is None:
             raise credential_exception
 
-        token_data = TokenData(id=id, role=role)
+        token_data = TokenData(id=id, role=role, tier=payload.get("tier") or SubscriptionTier.FREE.value)
+        exp = payload.get("exp")
+        if exp is not None:
+            token_cache.set(key, float(exp), token_data)
         return token_data
     except JWTError:
         raise credential_exception
@@ -38,6 +122,3 @@ def get_current_user(token: str = Depends(oauth2scheme)) -> TokenData:
     )
 
     return verify_access_token(token, credential_exception)
-            
-        
-        
\ No newline at end of file
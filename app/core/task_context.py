@@ -0,0 +1,33 @@
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from app.core.metrics import TaskMetrics
+
+
+@dataclass(frozen=True)
+class TaskContext:
+    """Identifies the agent task a coroutine is running for (set by the worker around each run)."""
+    task_id: str
+    user_id: str
+    message_id: str
+    # Filled in by instrumented agents, models and tools; stored on AgentTask.metrics
+    metrics: Optional["TaskMetrics"] = field(default=None, compare=False)
+    # Progress events of the run, stored on AgentTask.trace
+    trace: Optional[list] = field(default=None, compare=False)
+
+
+_current_task: ContextVar[Optional[TaskContext]] = ContextVar("current_task", default=None)
+
+
+def get_current_task() -> Optional[TaskContext]:
+    return _current_task.get()
+
+
+def set_current_task(task: Optional[TaskContext]):
+    return _current_task.set(task)
+
+
+def reset_current_task(token):
+    _current_task.reset(token)
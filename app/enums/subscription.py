@@ -13,3 +13,17 @@ SUBSCRIPTION_PRICING = {
 }
 
 
+# Requests per window for tier-limited endpoints (limits/slowapi syntax)
+SUBSCRIPTION_RATE_LIMITS = {
+    SubscriptionTier.FREE: "5/minute",
+    SubscriptionTier.PRO: "30/minute",
+    SubscriptionTier.ENTERPRISE: "120/minute",
+}
+
+
+# Agent tasks a single user may have queued or running at once
+SUBSCRIPTION_CONCURRENT_TASKS = {
+    SubscriptionTier.FREE: 2,
+    SubscriptionTier.PRO: 20,
+    SubscriptionTier.ENTERPRISE: 200,
+}
@@ -1,27 +1,40 @@
-from fastapi import FastAPI, Request, Depends
-from fastapi.responses import Response, RedirectResponse
-import httpx
+from fastapi import FastAPI, Request, Depends, HTTPException
+from fastapi.responses import Response, RedirectResponse, StreamingResponse
+import json
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from redis.asyncio import Redis
 from app.core.logging import logger
-from app.core.limiter import limiter
+from app.core.limiter import limiter, tier_limit, task_slots
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
 from slowapi import _rate_limit_exceeded_handler
-from app.tasks.tasks import run_agent_task
-from app.schemas.agent_task import AgentTaskRequest, AgentTaskResponse
-from app.core.database import Base, engine
+from app.tasks.celery_app import celery, RUN_AGENT_TASK
+from app.schemas.agent_task import AgentTaskRequest, AgentTaskResponse, AgentBatchRequest, AgentBatchResponse, AgentBatchStatusResponse
+from celery import group
+from celery.result import GroupResult
+from sqlalchemy import insert, select
+from uuid import uuid4
+from app.core.database import Base, engine, async_engine, AsyncSessionLocal
 from app.models import *
 from app.scripts import admin
 from app.core.security import get_current_user
 from app.schemas import TokenData
 from app.api.v1.router import router as api_router
 from app.api.deps import get_db
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from app.enums.messages import MessageRole
+from app.enums.task_status import TaskStatus
+from app.enums.users import UserRole
 from redis.asyncio import Redis
 from app.core.config import CONFIG
+from app.core.events import task_stream_key
+from app.core.redis_client import get_async_redis
+from app.tasks.routing import admission_controller, dispatch_options
+from app.tasks.status import task_status_cache
+from app.core.metrics import metrics_payload
+from prometheus_client import CONTENT_TYPE_LATEST
 
 
 
@@ -31,8 +44,10 @@ from app.core.config import CONFIG
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting application...")
-    Base.metadata.create_all(bind=engine)
-    redis_client = Redis(host=CONFIG.REDIS_HOST, port=CONFIG.REDIS_PORT, decode_responses=True)
+    if CONFIG.DB_CREATE_TABLES:
+        Base.metadata.create_all(bind=engine)
+    # The same REDIS_URL client the workers use, so task slots and status cache entries are shared
+    redis_client = get_async_redis()
     app.state.redis = redis_client
     admin.create_admin()
     try:
@@ -46,6 +61,7 @@ async def lifespan(app: FastAPI):
         logger.error(e)
     finally:
         logger.info("Shutting down application...")
+        await async_engine.dispose()
 
 
 
@@ -77,23 +93,204 @@ def health(request: Request):
     return {"status": "ok"}
 
 
+@app.get("/metrics", description="Prometheus metrics", include_in_schema=False)
+def metrics():
+    return Response(metrics_payload(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.post("/run-agent", description="Run an agent")
-@limiter.limit("5/minute")
-def run_agent(request: Request, prompt: AgentTaskRequest, current_user: TokenData = Depends(get_current_user), db: Session = Depends(get_db)):
-    message = Message(
-        role=MessageRole.USER,
-        content=prompt.prompt,
-        user_id=current_user.id
-    )
-    db.add(message)
-    db.commit()
-    task = run_agent_task.delay(prompt.prompt, current_user.id, message.id)
-    return {"task_id": task.id}
+@limiter.limit(tier_limit)
+async def run_agent(request: Request, prompt: AgentTaskRequest, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    redis: Redis = request.app.state.redis
+    admission = await admission_controller.check(get_async_redis(), current_user.tier)
+    if not admission.accepted:
+        raise HTTPException(status_code=503, detail="The agent queue is full, try again later", headers={"Retry-After": "60"})
+    if prompt.conversation_id:
+        conversation = await db.get(Conversation, prompt.conversation_id)
+        if conversation is None or conversation.user_id != current_user.id:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+    task_id = str(uuid4())
+    await task_slots.acquire_or_raise(redis, current_user.id, current_user.tier, [task_id])
+    try:
+        message = Message(
+            id=str(uuid4()),
+            role=MessageRole.USER,
+            content=prompt.prompt,
+            user_id=current_user.id,
+            conversation_id=prompt.conversation_id,
+        )
+        db.add(message)
+        # Recorded before dispatch so /tasks/{id} can answer from the database straight away
+        db.add(AgentTask(id=task_id, prompt=prompt.prompt, user_id=current_user.id, message_id=message.id))
+        await db.commit()
+        # Publishing to the broker is blocking I/O, keep it off the event loop
+        task = await run_in_threadpool(
+            celery.send_task,
+            RUN_AGENT_TASK,
+            (prompt.prompt, current_user.id, message.id),
+            task_id=task_id,
+            **dispatch_options(current_user.tier),
+        )
+    except Exception:
+        await task_slots.release_async(redis, current_user.id, [task_id])
+        raise
+    return {
+        "task_id": task.id,
+        "queue": admission.queue,
+        "queue_depth": admission.queue_depth,
+        "estimated_wait_seconds": admission.estimated_wait_seconds,
+    }
+
+def _can_read_task(task: dict | None, current_user: TokenData) -> bool:
+    return task is not None and (task["user_id"] == current_user.id or current_user.role == UserRole.ADMIN.value)
+
 
 @app.get("/tasks/{task_id}", response_model=AgentTaskResponse, description="Get task status")
 @limiter.limit("5/minute")
-def get_tasks(request: Request, task_id: str, current_user: TokenData = Depends(get_current_user)):
-    result = run_agent_task.AsyncResult(task_id)
-    return {"state": result.state, "result": result.result}
+async def get_tasks(request: Request, task_id: str, include_trace: bool = False, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    async def load():
+        return await db.get(AgentTask, task_id)
+
+    task = await task_status_cache.get(request.app.state.redis, task_id, load)
+    if not _can_read_task(task, current_user):
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not include_trace:
+        task.pop("trace")
+    return task
+
+
+@app.post("/run-agent/batch", response_model=AgentBatchResponse, description="Run an agent once per prompt")
+@limiter.limit(tier_limit)
+async def run_agent_batch(request: Request, batch: AgentBatchRequest, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    redis: Redis = request.app.state.redis
+    # A batch holds one task slot per prompt, so a larger one could never be admitted
+    cap = task_slots.cap(current_user.tier)
+    if len(batch.prompts) > cap:
+        raise HTTPException(
+            status_code=422,
+            detail=f"A batch may hold at most {cap} prompts on the {current_user.tier} tier (got {len(batch.prompts)})",
+        )
+    rows = [
+        {"id": str(uuid4()), "role": MessageRole.USER, "content": prompt, "user_id": current_user.id}
+        for prompt in batch.prompts
+    ]
+    task_ids = [str(uuid4()) for _ in rows]
+    admission = await admission_controller.check(get_async_redis(), current_user.tier, incoming=len(rows))
+    if not admission.accepted:
+        raise HTTPException(status_code=503, detail="The agent queue is full, try again later", headers={"Retry-After": "60"})
+    # The whole batch must fit in the user's concurrent-task cap
+    await task_slots.acquire_or_raise(redis, current_user.id, current_user.tier, task_ids)
+
+    def dispatch():
+        options = dispatch_options(current_user.tier)
+        group_result = group(
+            celery.signature(RUN_AGENT_TASK, (row["content"], current_user.id, row["id"])).set(task_id=task_id, **options)
+            for row, task_id in zip(rows, task_ids)
+        ).apply_async()
+        group_result.save()
+        return group_result
+
+    task_rows = [
+        {"id": task_id, "prompt": row["content"], "user_id": current_user.id, "message_id": row["id"], "status": TaskStatus.PENDING}
+        for row, task_id in zip(rows, task_ids)
+    ]
+
+    try:
+        # One multi-row INSERT per table and one commit for the whole batch
+        await db.execute(insert(Message), rows)
+        await db.execute(insert(AgentTask), task_rows)
+        await db.commit()
+        group_result = await run_in_threadpool(dispatch)
+    except Exception:
+        await task_slots.release_async(redis, current_user.id, task_ids)
+        raise
+    return {
+        "batch_id": group_result.id,
+        "task_ids": [result.id for result in group_result.results],
+        "queue": admission.queue,
+        "queue_depth": admission.queue_depth,
+        "estimated_wait_seconds": admission.estimated_wait_seconds,
+    }
+
+
+@app.get("/batches/{batch_id}", response_model=AgentBatchStatusResponse, description="Get batch progress")
+@limiter.limit("30/minute")
+async def get_batch(request: Request, batch_id: str, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    group_result = await run_in_threadpool(GroupResult.restore, batch_id, app=celery)
+    if group_result is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    # One query for every task's owner and status. The rows also record failed runs,
+    # which Celery reports as SUCCESS because run_agent_task returns the error
+    task_ids = [result.id for result in group_result.results]
+    rows = (await db.execute(select(AgentTask.user_id, AgentTask.status).where(AgentTask.id.in_(task_ids)))).all()
+    if not rows or (current_user.role != UserRole.ADMIN.value and any(row.user_id != current_user.id for row in rows)):
+        raise HTTPException(status_code=404, detail="Batch not found")
+    statuses = [row.status for row in rows]
+    return {
+        "batch_id": batch_id,
+        "total": len(task_ids),
+        "pending": statuses.count(TaskStatus.PENDING),
+        "running": statuses.count(TaskStatus.RUNNING),
+        "succeeded": statuses.count(TaskStatus.COMPLETED),
+        "failed": statuses.count(TaskStatus.FAILED),
+    }
+
+
+def _sse(event: str, data: str, event_id: str = None) -> str:
+    frame = f"id: {event_id}\n" if event_id else ""
+    return frame + f"event: {event}\ndata: {data}\n\n"
+
+
+def _final_frame(task: dict) -> str:
+    """A `final` event built from the task row, shaped like the one the worker publishes."""
+    if task["state"] == "SUCCESS":
+        return _sse("final", json.dumps({"state": "SUCCESS", "result": task["result"]}, default=str))
+    return _sse("final", json.dumps({"state": "FAILURE", "error": task["error"]}, default=str))
+
+
+@app.get("/tasks/{task_id}/stream", description="Stream task progress as server-sent events")
+@limiter.limit("5/minute")
+async def stream_task(request: Request, task_id: str, current_user: TokenData = Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    # The client the worker publishes events to (REDIS_URL)
+    redis: Redis = get_async_redis()
+
+    async def load():
+        return await db.get(AgentTask, task_id)
 
+    async def reload():
+        # The request's session may already be closed while the response streams
+        async with AsyncSessionLocal() as session:
+            return await session.get(AgentTask, task_id)
 
+    # Same visibility as /tasks/{id}: only the owner or an admin may follow a run
+    if not _can_read_task(await task_status_cache.get(redis, task_id, load), current_user):
+        raise HTTPException(status_code=404, detail="Task not found")
+    key = task_stream_key(task_id)
+    # Resume after the last event the client saw, otherwise replay from the start
+    last_id = request.headers.get("last-event-id", "0-0")
+
+    async def events():
+        nonlocal last_id
+        while not await request.is_disconnected():
+            entries = await redis.xread({key: last_id}, count=100, block=15_000)
+            if not entries:
+                # Nothing published (yet): the run may have finished before streaming or expired.
+                # The task row knows, and unlike the Celery result it records failed runs as failures
+                task = await task_status_cache.get(redis, task_id, reload)
+                if task is not None and task["state"] in ("SUCCESS", "FAILURE"):
+                    yield _final_frame(task)
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            for event_id, fields in entries[0][1]:
+                last_id = event_id
+                yield _sse(fields["event"], fields["data"], event_id)
+                if fields["event"] == "final":
+                    return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
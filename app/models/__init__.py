@@ -1,4 +1,5 @@
 from app.models.users import User
 from app.models.agent_tasks import AgentTask
 from app.models.messages import Message
-from app.models.generated_files import GeneratedFile
\ No newline at end of file
+from app.models.generated_files import GeneratedFile
+from app.models.conversations import Conversation
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index, JSON, TEXT
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime, timezone
@@ -10,16 +10,26 @@ def get_now():
 
 class AgentTask(Base):
     __tablename__ = "agent_tasks"
+    # Serves a user's task history newest first, id breaks created_at ties for keyset pagination
+    __table_args__ = (Index("ix_agent_tasks_user_id_created_at", "user_id", "created_at", "id"),)
 
     id = Column(String, primary_key=True, index=True)
     user_id = Column(String, ForeignKey("users.id"))
     prompt = Column(String, nullable=False)
     message_id = Column(String, ForeignKey("messages.id"))
     status = Column(Enum(TaskStatus), default=TaskStatus.PENDING)
+    result = Column(TEXT, nullable=True)
+    error = Column(TEXT, nullable=True)
+    # Ordered progress events of the run (tool calls, retries, final state), without streamed tokens
+    trace = Column(JSON, nullable=True)
+    # Per-task latency, token and cost summary (see app.core.metrics.TaskMetrics)
+    metrics = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=get_now)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
     updated_at = Column(DateTime, default=get_now, onupdate=get_now)
 
     # Relationships
     message = relationship("Message", back_populates="task", foreign_keys=[message_id])
     generated_files = relationship("GeneratedFile", back_populates="task")
-    user = relationship("User", back_populates="tasks")
\ No newline at end of file
+    user = relationship("User", back_populates="tasks")
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, TEXT
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+from datetime import datetime, timezone
+from uuid import uuid4
+
+def get_now():
+    return datetime.now(timezone.utc)
+
+class Conversation(Base):
+    __tablename__ = "conversations"
+    __table_args__ = (Index("ix_conversations_user_id_created_at", "user_id", "created_at", "id"),)
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
+    user_id = Column(String, ForeignKey("users.id"))
+    title = Column(String, nullable=True)
+    # Rolling summary of every turn up to and including summarized_until_id, see app/agents/conversation.py
+    summary = Column(TEXT, nullable=True)
+    summarized_until_id = Column(String, ForeignKey("messages.id"), nullable=True)
+    created_at = Column(DateTime, default=get_now)
+    updated_at = Column(DateTime, default=get_now, onupdate=get_now)
+
+    # Relationships
+    user = relationship("User", back_populates="conversations")
+    messages = relationship("Message", back_populates="conversation", foreign_keys="Message.conversation_id")
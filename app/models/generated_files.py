@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime, timezone
@@ -10,6 +10,8 @@ def get_now():
 
 class GeneratedFile(Base):
     __tablename__ = "generated_files"
+    # Keyset pagination of a user's history, see app/api/v1/history
+    __table_args__ = (Index("ix_generated_files_user_id_created_at", "user_id", "created_at", "id"),)
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
     task_id = Column(String, ForeignKey("agent_tasks.id"))
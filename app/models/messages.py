@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, TEXT
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey, Index, TEXT
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 from datetime import datetime, timezone
@@ -10,9 +10,16 @@ def get_now():
 
 class Message(Base):
     __tablename__ = "messages"
+    # Keyset pagination of a user's history, see app/api/v1/history
+    __table_args__ = (
+        Index("ix_messages_user_id_created_at", "user_id", "created_at", "id"),
+        # Loads a conversation's turns in order
+        Index("ix_messages_conversation_id_created_at", "conversation_id", "created_at", "id"),
+    )
 
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
     user_id = Column(String, ForeignKey("users.id"))
+    conversation_id = Column(String, ForeignKey("conversations.id"), nullable=True)
     role = Column(Enum(MessageRole), nullable=False)
     content = Column(TEXT, nullable=False)
     created_at = Column(DateTime, default=get_now)
@@ -20,4 +27,5 @@ class Message(Base):
     # Relationships
     task = relationship("AgentTask", back_populates="message", uselist=False)
     user = relationship("User", back_populates="messages")
+    conversation = relationship("Conversation", back_populates="messages", foreign_keys=[conversation_id])
     generated_files = relationship("GeneratedFile", back_populates="message")
\ No newline at end of file
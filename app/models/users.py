@@ -27,4 +27,5 @@ class User(Base):
     # Relationships
     tasks = relationship("AgentTask", back_populates="user")
     messages = relationship("Message", back_populates="user")
-    generated_files = relationship("GeneratedFile", back_populates="user")
\ No newline at end of file
+    generated_files = relationship("GeneratedFile", back_populates="user")
+    conversations = relationship("Conversation", back_populates="user")
\ No newline at end of file
@@ -1,2 +1,2 @@
 from app.schemas.token import TokenData
-from app.schemas.agent_task import AgentTaskRequest, AgentTaskResponse
\ No newline at end of file
+from app.schemas.agent_task import AgentTaskRequest, AgentTaskResponse, AgentBatchRequest, AgentBatchResponse, AgentBatchStatusResponse
\ No newline at end of file
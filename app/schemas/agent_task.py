@@ -1,9 +1,40 @@
+from datetime import datetime
+from typing import Any
 from pydantic import BaseModel, Field
+from app.core.config import CONFIG
 
 class AgentTaskRequest(BaseModel):
     prompt: str = Field(..., description="The prompt to run the agent with", examples=["What is the capital of France?"])
+    conversation_id: str | None = Field(None, description="Continue this conversation; earlier turns are given to the agent")
 
 
 class AgentTaskResponse(BaseModel):
     state: str = Field(..., description="The state of the task", examples=["PENDING", "SUCCESS", "FAILURE"])
-    result: str | None = Field(None, description="The result of the task")
\ No newline at end of file
+    result: str | None = Field(None, description="The result of the task")
+    error: str | None = Field(None, description="Why the task failed")
+    created_at: datetime | None = Field(None, description="When the task was submitted")
+    started_at: datetime | None = Field(None, description="When a worker started the task")
+    finished_at: datetime | None = Field(None, description="When the task finished")
+    metrics: dict[str, Any] | None = Field(None, description="Latency, token and cost summary of the run")
+    trace: list[dict[str, Any]] | None = Field(None, description="Progress events of the run, with include_trace=true")
+
+
+class AgentBatchRequest(BaseModel):
+    prompts: list[str] = Field(..., min_length=1, max_length=CONFIG.BATCH_MAX_PROMPTS, description="The prompts to run, one agent task each")
+
+
+class AgentBatchResponse(BaseModel):
+    batch_id: str = Field(..., description="The id of the batch")
+    task_ids: list[str] = Field(..., description="The task ids, in the same order as the prompts")
+    queue: str = Field(..., description="The queue the tasks were routed to")
+    queue_depth: int = Field(..., description="Tasks already waiting in that queue")
+    estimated_wait_seconds: float = Field(..., description="Rough wait before the first task starts")
+
+
+class AgentBatchStatusResponse(BaseModel):
+    batch_id: str = Field(..., description="The id of the batch")
+    total: int = Field(..., description="Number of tasks in the batch")
+    pending: int = Field(..., description="Tasks waiting in the queue")
+    running: int = Field(..., description="Tasks being worked on")
+    succeeded: int = Field(..., description="Tasks that finished")
+    failed: int = Field(..., description="Tasks that crashed")
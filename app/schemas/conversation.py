@@ -0,0 +1,12 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class ConversationCreate(BaseModel):
+    title: str | None = Field(None, max_length=200, description="Optional label for the conversation")
+
+
+class ConversationResponse(BaseModel):
+    id: str
+    title: str | None = None
+    created_at: datetime
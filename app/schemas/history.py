@@ -0,0 +1,48 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from app.enums.files import FileType
+from app.enums.messages import MessageRole
+from app.enums.task_status import TaskStatus
+
+
+class MessageHistoryItem(BaseModel):
+    id: str
+    role: MessageRole
+    content: str
+    conversation_id: str | None = None
+    created_at: datetime
+
+
+class TaskHistoryItem(BaseModel):
+    id: str
+    status: TaskStatus
+    prompt: str
+    message_id: str | None = None
+    created_at: datetime
+    finished_at: datetime | None = None
+
+
+class FileHistoryItem(BaseModel):
+    id: str
+    filename: str
+    title: str | None = None
+    file_type: FileType
+    file_size: int | None = None
+    task_id: str | None = None
+    created_at: datetime
+    url: str = Field(..., description="Download path of the file")
+
+
+class MessageHistoryPage(BaseModel):
+    items: list[MessageHistoryItem]
+    next_cursor: str | None = Field(None, description="Pass as cursor to get the next (older) page; null on the last page")
+
+
+class TaskHistoryPage(BaseModel):
+    items: list[TaskHistoryItem]
+    next_cursor: str | None = Field(None, description="Pass as cursor to get the next (older) page; null on the last page")
+
+
+class FileHistoryPage(BaseModel):
+    items: list[FileHistoryItem]
+    next_cursor: str | None = Field(None, description="Pass as cursor to get the next (older) page; null on the last page")
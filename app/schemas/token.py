@@ -2,4 +2,5 @@ from pydantic import BaseModel
 
 class TokenData(BaseModel):
     id: str
-    role: str
\ No newline at end of file
+    role: str
+    tier: str = "free"
\ No newline at end of file
@@ -4,12 +4,20 @@ from app.models.users import User
 from app.enums.users import UserRole
 from app.enums.subscription import SubscriptionTier
 from app.core.config import CONFIG
+from sqlalchemy import or_, select
 from sqlalchemy.exc import IntegrityError
 from app.core.logging import logger
 
 def create_admin():
     db = SessionLocal()
     try:
+        # Runs on every API start: skip the bcrypt hash when the admin is already there
+        existing = db.scalar(
+            select(User.id).where(or_(User.username == CONFIG.ADMIN_USERNAME, User.email == CONFIG.ADMIN_EMAIL)).limit(1)
+        )
+        if existing is not None:
+            logger.info("Admin already exists")
+            return
         admin = User(
             email=CONFIG.ADMIN_EMAIL,
             hashed_password=hash_password(CONFIG.ADMIN_PASSWORD),
@@ -1,4 +1,14 @@
 from passlib.context import CryptContext
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from app.core.config import CONFIG
+from app.core.logging import logger
+from app.core.metrics import PASSWORD_VERIFY_CACHE_HITS, PASSWORD_VERIFY_QUEUE_SECONDS
+import asyncio
+import hashlib
+import hmac
+import time
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -11,3 +21,72 @@ def verify_password(password: str, hashed_password: str) -> bool:
     return pwd_context.verify(password, hashed_password)
 
 
+class PasswordVerifier:
+    """
+    Runs bcrypt verification in a bounded thread pool instead of on the event loop.
+
+    bcrypt releases the GIL, so the pool size is the number of hashes computed in
+    parallel; callers beyond that wait their turn and the wait is recorded in
+    password_verify_queue_seconds. When cache_ttl is set, recent successful
+    verifications are remembered under an HMAC of (username, password, stored
+    hash) so scripted clients that log in repeatedly skip bcrypt. The cache is an LRU of at most cache_size entries in
+    process memory, and a password change (new stored hash) invalidates it.
+    """
+
+    def __init__(self, max_workers: int = 4, cache_ttl: int = 0, cache_size: int = 1024):
+        self.max_workers = max_workers
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Only touched from the event loop, so no lock is needed
+        self._cache: OrderedDict[str, float] = OrderedDict()
+
+    def _cache_key(self, username: str, password: str, hashed_password: str) -> str:
+        message = "\0".join((username, password, hashed_password)).encode()
+        return hmac.new(CONFIG.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+    def _cached(self, key: str) -> bool:
+        expires_at = self._cache.get(key)
+        if expires_at is None:
+            return False
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return False
+        self._cache.move_to_end(key)
+        return True
+
+    def _remember(self, key: str):
+        self._cache[key] = time.monotonic() + self.cache_ttl
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def verify(self, username: str, password: str, hashed_password: str) -> bool:
+        key = self._cache_key(username, password, hashed_password) if self.cache_ttl and self.cache_size else None
+        if key and self._cached(key):
+            PASSWORD_VERIFY_CACHE_HITS.inc()
+            return True
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        queued = time.perf_counter()
+        async with self._semaphore:
+            queue_time = time.perf_counter() - queued
+            PASSWORD_VERIFY_QUEUE_SECONDS.observe(queue_time)
+            if queue_time > 0.5:
+                logger.warning(f"Password verification queued for {queue_time * 1000:.0f}ms")
+            loop = asyncio.get_running_loop()
+            valid = await loop.run_in_executor(self._executor, verify_password, password, hashed_password)
+
+        if valid and key:
+            self._remember(key)
+        return valid
+
+
+password_verifier = PasswordVerifier(
+    max_workers=CONFIG.PASSWORD_VERIFY_WORKERS,
+    cache_ttl=CONFIG.PASSWORD_VERIFY_CACHE_TTL,
+    cache_size=CONFIG.PASSWORD_VERIFY_CACHE_SIZE,
+)
@@ -0,0 +1,49 @@
+from celery import Celery
+from app.core.config import CONFIG
+from app.tasks.routing import TASK_QUEUES, TIER_ROUTING, PRIORITY_STEPS, PRIORITY_SEP, get_routing
+from app.tasks.serialization import COMPACT_SERIALIZER, register_compact_serializer
+
+
+# The API sends tasks by name so it never imports app.tasks.tasks (agents, pydantic_ai, PDF stack);
+# workers run `celery -A app.tasks.tasks`, which registers the implementations on this app
+RUN_AGENT_TASK = "app.tasks.tasks.run_agent_task"
+
+celery = Celery(
+    backend=CONFIG.REDIS_URL,
+    broker=CONFIG.REDIS_URL,
+)
+
+if CONFIG.CELERY_SERIALIZER == COMPACT_SERIALIZER:
+    register_compact_serializer(CONFIG.CELERY_COMPRESSION, CONFIG.CELERY_COMPRESSION_THRESHOLD)
+
+celery.conf.update(
+    task_serializer=CONFIG.CELERY_SERIALIZER,
+    result_serializer=CONFIG.CELERY_SERIALIZER,
+    # JSON stays accepted so messages and results from before a switch can still be read
+    accept_content=sorted({"json", CONFIG.CELERY_SERIALIZER}),
+    result_accept_content=sorted({"json", CONFIG.CELERY_SERIALIZER}),
+    result_expires=CONFIG.CELERY_RESULT_EXPIRES,
+    timezone="UTC",
+    enable_utc=True,
+    task_queues=TASK_QUEUES,
+    task_default_queue=TASK_QUEUES[0].name,
+    broker_transport_options={
+        "priority_steps": PRIORITY_STEPS,
+        "sep": PRIORITY_SEP,
+        "queue_order_strategy": "priority",
+    },
+    # Agent runs are long; don't let one worker hoard queued tasks other workers could start
+    worker_prefetch_multiplier=1,
+)
+
+if CONFIG.WORKER_TIER:
+    # A worker dedicated to one tier consumes only that tier's queue with its own sizing
+    if CONFIG.WORKER_TIER not in TIER_ROUTING:
+        # get_routing would quietly fall back to the free tier and leave the intended queue unserved
+        raise RuntimeError(f"Unknown WORKER_TIER {CONFIG.WORKER_TIER!r}; use one of {', '.join(TIER_ROUTING)}")
+    tier_routing = get_routing(CONFIG.WORKER_TIER)
+    celery.conf.update(
+        task_queues=[queue for queue in TASK_QUEUES if queue.name == tier_routing["queue"]],
+        worker_concurrency=tier_routing["concurrency"],
+        worker_prefetch_multiplier=tier_routing["prefetch_multiplier"],
+    )
@@ -0,0 +1,128 @@
+from dataclasses import dataclass
+from typing import Optional
+from kombu import Exchange, Queue
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from app.core.logging import logger
+from app.enums.subscription import SubscriptionTier
+
+
+# Redis has no native priorities: kombu emulates them with one list per step,
+# named "<queue><sep><step>" (step 0 is the plain queue name and is served first)
+PRIORITY_STEPS = list(range(10))
+PRIORITY_SEP = ":"
+
+# Queue, message priority and the worker settings used by a worker dedicated to each tier
+TIER_ROUTING = {
+    SubscriptionTier.FREE: {
+        "queue": "agents.free",
+        "priority": 6,
+        "concurrency": 4,
+        "prefetch_multiplier": 1,
+        "max_queue_depth": 500,
+    },
+    SubscriptionTier.PRO: {
+        "queue": "agents.pro",
+        "priority": 3,
+        "concurrency": 8,
+        "prefetch_multiplier": 1,
+        "max_queue_depth": 2_000,
+    },
+    SubscriptionTier.ENTERPRISE: {
+        "queue": "agents.enterprise",
+        "priority": 0,
+        "concurrency": 16,
+        "prefetch_multiplier": 1,
+        "max_queue_depth": 10_000,
+    },
+}
+
+# The routing key equals the queue name, which lets a worker tell which tier queue a task came from
+TASK_QUEUES = [
+    Queue(routing["queue"], Exchange(routing["queue"]), routing_key=routing["queue"])
+    for routing in TIER_ROUTING.values()
+]
+
+# Used for the first estimate, before any task has finished on a queue
+DEFAULT_TASK_SECONDS = 60.0
+DURATION_SMOOTHING = 0.2
+
+
+def get_routing(tier: str) -> dict:
+    try:
+        return TIER_ROUTING[SubscriptionTier(tier)]
+    except ValueError:
+        return TIER_ROUTING[SubscriptionTier.FREE]
+
+
+def max_queue_wait(tier: str) -> float:
+    """Expected wait at the back of a full queue for the tier, at DEFAULT_TASK_SECONDS per task."""
+    routing = get_routing(tier)
+    return routing["max_queue_depth"] * DEFAULT_TASK_SECONDS / routing["concurrency"]
+
+
+def dispatch_options(tier: str) -> dict:
+    """apply_async options that send a task to its tier's queue with its tier's priority."""
+    routing = get_routing(tier)
+    return {"queue": routing["queue"], "priority": routing["priority"]}
+
+
+def queue_keys(queue: str) -> list[str]:
+    return [queue if step == 0 else f"{queue}{PRIORITY_SEP}{step}" for step in PRIORITY_STEPS]
+
+
+def duration_key(queue: str) -> str:
+    return f"queue_task_seconds:{queue}"
+
+
+@dataclass
+class Admission:
+    accepted: bool
+    queue: str
+    queue_depth: int
+    estimated_wait_seconds: float
+
+
+class AdmissionController:
+    """
+    Decides whether a tier's queue can take more work and how long it will wait.
+
+    Depth is read straight from the broker lists. The wait estimate is depth x a
+    smoothed per-queue task duration (recorded by workers) / the tier's worker
+    concurrency, so it is a rough guide rather than a promise.
+    """
+
+    async def check(self, redis: Redis, tier: str, incoming: int = 1) -> Admission:
+        routing = get_routing(tier)
+        queue = routing["queue"]
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in queue_keys(queue):
+                    pipe.llen(key)
+                pipe.get(duration_key(queue))
+                *depths, average = await pipe.execute()
+        except Exception as e:
+            # Never refuse work because the estimate is unavailable
+            logger.error(f"Admission check failed for {queue}: {e}")
+            return Admission(True, queue, 0, 0.0)
+
+        depth = sum(depths)
+        average = float(average) if average else DEFAULT_TASK_SECONDS
+        estimated_wait = depth * average / routing["concurrency"]
+        accepted = depth + incoming <= routing["max_queue_depth"]
+        return Admission(accepted, queue, depth, round(estimated_wait, 1))
+
+    def record_duration(self, redis: SyncRedis, queue: Optional[str], seconds: float):
+        if not queue:
+            return
+        try:
+            previous = redis.get(duration_key(queue))
+            average = seconds if previous is None else (
+                DURATION_SMOOTHING * seconds + (1 - DURATION_SMOOTHING) * float(previous)
+            )
+            redis.set(duration_key(queue), average)
+        except Exception as e:
+            logger.error(f"Failed to record task duration for {queue}: {e}")
+
+
+admission_controller = AdmissionController()
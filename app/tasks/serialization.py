@@ -0,0 +1,73 @@
+import zlib
+from datetime import date, datetime
+from kombu.serialization import register
+
+
+COMPACT_SERIALIZER = "compact"
+COMPACT_CONTENT_TYPE = "application/x-agency-compact"
+
+# First byte of every compact payload: how the msgpack body after it is stored
+RAW = b"\x00"
+ZLIB = b"\x01"
+ZSTD = b"\x02"
+
+
+def _msgpack():
+    # msgpack is only needed when CELERY_SERIALIZER=compact
+    try:
+        import msgpack
+    except ImportError:
+        raise RuntimeError("CELERY_SERIALIZER=compact requires the msgpack package: pip install msgpack")
+    return msgpack
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("CELERY_COMPRESSION=zstd requires the zstandard package: pip install zstandard")
+    return zstandard
+
+
+def _default(value):
+    # Same fallbacks as the JSON serializer: ISO dates, anything else as text
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def register_compact_serializer(compression: str = "zlib", threshold: int = 1024, level: int = 3):
+    """
+    Register the `compact` kombu serializer: msgpack, compressed once it exceeds `threshold` bytes.
+
+    Short payloads (most task arguments, status updates) skip compression, whose
+    framing would make them larger. Decoding reads the header byte, so workers
+    and API processes configured with different codecs still understand each other.
+    """
+    msgpack = _msgpack()
+    if compression == "zstd":
+        zstandard = _zstandard()
+        codec, compress = ZSTD, zstandard.ZstdCompressor(level=level).compress
+    elif compression == "zlib":
+        codec, compress = ZLIB, lambda data: zlib.compress(data, level)
+    else:
+        raise RuntimeError(f"Unknown CELERY_COMPRESSION {compression!r}; use zlib or zstd")
+
+    def dumps(value) -> bytes:
+        data = msgpack.packb(value, use_bin_type=True, default=_default)
+        if len(data) > threshold:
+            return codec + compress(data)
+        return RAW + data
+
+    def loads(payload) -> object:
+        payload = bytes(payload)
+        header, data = payload[:1], payload[1:]
+        if header == ZLIB:
+            data = zlib.decompress(data)
+        elif header == ZSTD:
+            data = _zstandard().ZstdDecompressor().decompress(data)
+        elif header != RAW:
+            raise ValueError(f"Unknown compact payload header {header!r}")
+        return msgpack.unpackb(data, raw=False)
+
+    register(COMPACT_SERIALIZER, dumps, loads, content_type=COMPACT_CONTENT_TYPE, content_encoding="binary")
@@ -0,0 +1,93 @@
+import json
+from typing import Awaitable, Callable, Optional
+from redis import Redis as SyncRedis
+from redis.asyncio import Redis
+from app.core.config import CONFIG
+from app.core.logging import logger
+from app.enums.task_status import TaskStatus
+from app.models.agent_tasks import AgentTask
+
+
+# /tasks/{id} keeps reporting Celery state names, so existing clients are unaffected
+TASK_STATES = {
+    TaskStatus.PENDING: "PENDING",
+    TaskStatus.RUNNING: "STARTED",
+    TaskStatus.COMPLETED: "SUCCESS",
+    TaskStatus.FAILED: "FAILURE",
+}
+
+FINISHED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+
+
+def task_status_key(task_id: str) -> str:
+    return f"task:{task_id}:status"
+
+
+def task_result(task_id: str, result: str):
+    """
+    What run_agent_task stores in the Celery result backend.
+
+    The output is already on the AgentTask row (and in Message.content), so with
+    CELERY_RESULT_MODE=pointer the backend only keeps a reference to that row.
+    """
+    if CONFIG.CELERY_RESULT_MODE == "pointer":
+        return {"agent_task": task_id}
+    return result
+
+
+def _isoformat(value) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def serialize_task(task: AgentTask) -> dict:
+    return {
+        "task_id": task.id,
+        "user_id": task.user_id,
+        "state": TASK_STATES[task.status],
+        "result": task.result,
+        "error": task.error,
+        "created_at": _isoformat(task.created_at),
+        "started_at": _isoformat(task.started_at),
+        "finished_at": _isoformat(task.finished_at),
+        "metrics": task.metrics,
+        "trace": task.trace,
+    }
+
+
+class TaskStatusCache:
+    """
+    Redis read-through cache in front of AgentTask rows for /tasks/{id}.
+
+    Finished tasks never change, so they are kept for TASK_STATUS_CACHE_TTL.
+    Pending and running tasks are kept only briefly; the worker also drops the
+    entry on every status change, so polling clients see transitions promptly.
+    """
+
+    async def get(self, redis: Redis, task_id: str, load: Callable[[], Awaitable[Optional[AgentTask]]]) -> Optional[dict]:
+        key = task_status_key(task_id)
+        try:
+            cached = await redis.get(key)
+            if cached is not None:
+                return json.loads(cached)
+        except Exception as e:
+            logger.error(f"Task status cache read failed for {task_id}: {e}")
+
+        task = await load()
+        if task is None:
+            return None
+        data = serialize_task(task)
+        ttl = CONFIG.TASK_STATUS_CACHE_TTL if task.status in FINISHED_STATUSES else CONFIG.TASK_STATUS_CACHE_ACTIVE_TTL
+        try:
+            await redis.set(key, json.dumps(data), ex=ttl)
+        except Exception as e:
+            logger.error(f"Task status cache write failed for {task_id}: {e}")
+        return data
+
+    def invalidate(self, redis: SyncRedis, task_id: str):
+        try:
+            redis.delete(task_status_key(task_id))
+        except Exception as e:
+            logger.error(f"Task status cache invalidation failed for {task_id}: {e}")
+
+
+task_status_cache = TaskStatusCache()
@@ -1,51 +1,109 @@
 from app.models import AgentTask, Message
-from celery import Celery
-import asyncio
-from app.agents.manager import AgentOrchestrator
+from app.models.agent_tasks import get_now
+from celery.signals import worker_init, worker_ready, worker_shutdown, worker_process_init, worker_process_shutdown
+from app.agents.pool import orchestrator_pool
+from app.agents.conversation import load_conversation
+from app.agents.tools.pdf_tool import pdf_renderer
+from app.core.task_context import TaskContext
+from app.core.limiter import task_slots
+from app.core.metrics import TaskMetrics, start_metrics_server, mark_process_dead
+from app.core.redis_client import get_sync_redis
+from app.tasks.status import task_status_cache, task_result
+from app.tasks.routing import admission_controller
+from app.tasks.celery_app import celery, RUN_AGENT_TASK
+import os
+import time
 from app.core.database import SessionLocal
 from app.core.config import CONFIG
 from app.enums import TaskStatus, MessageRole
 
 
-celery = Celery(
-    backend=CONFIG.REDIS_URL,
-    broker=CONFIG.REDIS_URL,
-)
+def _is_prefork(worker) -> bool:
+    pool_cls = worker.pool_cls
+    name = pool_cls if isinstance(pool_cls, str) else pool_cls.__module__
+    return name.rsplit(".", 1)[-1] == "prefork"
 
-celery.conf.update(
-    task_serializer="json",
-    accept_content=["json"],
-    result_serializer="json",
-    timezone="UTC",
-    enable_utc=True,
-)
 
-@celery.task(bind=True)
+@worker_init.connect
+def init_worker(sender, **kwargs):
+    # The threads pool runs tasks in this process and never sends worker_process_* signals;
+    # prefork children are initialised by init_worker_process after the fork instead
+    if not _is_prefork(sender):
+        orchestrator_pool.init()
+
+
+@worker_ready.connect
+def start_worker_metrics(sender, **kwargs):
+    # Once per worker, in the main process; prefork children would all race for the same port
+    start_metrics_server(CONFIG.WORKER_METRICS_PORT, multiprocess_pool=_is_prefork(sender.controller))
+
+
+@worker_shutdown.connect
+def shutdown_worker(**kwargs):
+    # Both are no-ops in a prefork parent, which never built them
+    orchestrator_pool.close()
+    pdf_renderer.shutdown()
+
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    orchestrator_pool.init()
+
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    orchestrator_pool.close()
+    pdf_renderer.shutdown()
+    mark_process_dead(os.getpid())
+
+
+@celery.task(bind=True, name=RUN_AGENT_TASK)
 def run_agent_task(self, prompt: str, user_id: str, message_id: str):
+    started = time.perf_counter()
+    task_id = str(self.request.id)
+    metrics = TaskMetrics()
+    trace = []
     with SessionLocal() as db:
-        task = AgentTask(
-            id=str(self.request.id),
-            prompt=prompt,
-            status=TaskStatus.RUNNING,
-            user_id=user_id,
-            message_id=message_id
-        )
-        db.add(task)
+        # The API creates the row as PENDING; tasks sent by other producers get one here
+        task = db.get(AgentTask, task_id)
+        if task is None:
+            task = AgentTask(id=task_id, prompt=prompt, user_id=user_id, message_id=message_id)
+            db.add(task)
+        task.status = TaskStatus.RUNNING
+        task.started_at = get_now()
         db.commit()
+        task_status_cache.invalidate(get_sync_redis(), task_id)
+        task_slots.hold_running(get_sync_redis(), user_id, task_id)
+        conversation = None
         try:
-            result = asyncio.run(AgentOrchestrator().run(prompt))
+            conversation = load_conversation(message_id)
+            result = orchestrator_pool.run(
+                prompt,
+                task=TaskContext(task_id=task_id, user_id=user_id, message_id=message_id, metrics=metrics, trace=trace),
+                conversation=conversation,
+            )
             task.status = TaskStatus.COMPLETED
             task.result = result
             new_message = Message(
                 role=MessageRole.ASSISTANT,
                 content=result,
-                user_id=user_id
+                user_id=user_id,
+                conversation_id=conversation.conversation_id if conversation else None,
             )
             db.add(new_message)
-            db.commit()
-            return result
+            return task_result(task_id, result)
         except Exception as e:
             task.status = TaskStatus.FAILED
-            task.result = str(e)
+            task.error = str(e)
+            return task_result(task_id, str(e))
+        finally:
+            task.finished_at = get_now()
+            task.metrics = metrics.summary()
+            # A timed-out run may still be appending on the worker loop
+            task.trace = list(trace)
             db.commit()
-            return str(e)
\ No newline at end of file
+            task_status_cache.invalidate(get_sync_redis(), task_id)
+            task_slots.release(get_sync_redis(), user_id, task_id)
+            admission_controller.record_duration(
+                get_sync_redis(), (self.request.delivery_info or {}).get("routing_key"), time.perf_counter() - started
+            )
\ No newline at end of file
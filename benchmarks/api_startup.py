@@ -0,0 +1,81 @@
+"""
+Measure how long a fresh API process takes to import app.main and run its startup.
+
+Each run is a new interpreter, like a uvicorn worker or a newly scheduled pod:
+it times `import app.main`, then the lifespan startup (table check, admin
+bootstrap, Redis ping) and shutdown. It also lists any worker-only modules
+(agents, pydantic_ai, the OpenAI client, WeasyPrint) the API pulled in.
+
+Uses the settings from .env / the environment, like the API itself. The first
+run against a new database also creates the tables and hashes the admin password.
+
+Usage:
+    python -m benchmarks.api_startup --runs 10
+    python -m benchmarks.api_startup --runs 5 --budget 1.0
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+WORKER_ONLY_MODULES = ["app.tasks.tasks", "app.agents.base", "pydantic_ai", "openai", "weasyprint"]
+
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter() - start
+
+async def lifespan():
+    start = time.perf_counter()
+    async with app.main.app.router.lifespan_context(app.main.app):
+        started = time.perf_counter() - start
+        start = time.perf_counter()
+    return started, time.perf_counter() - start
+
+started, stopped = asyncio.run(lifespan())
+print(json.dumps({
+    "import": imported,
+    "startup": started,
+    "shutdown": stopped,
+    "modules": len(sys.modules),
+    "worker_only": [name for name in %r if name in sys.modules],
+}))
+""" % (WORKER_ONLY_MODULES,)
+
+
+def run_once() -> dict:
+    completed = subprocess.run([sys.executable, "-c", CHILD], capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr else "child failed")
+    # Startup logs go to stdout as well; the result is the last line
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to start")
+    parser.add_argument("--budget", type=float, default=None, help="Exit non-zero if the median import + startup exceeds this many seconds")
+    args = parser.parse_args()
+
+    totals = []
+    for index in range(args.runs):
+        result = run_once()
+        total = result["import"] + result["startup"]
+        totals.append(total)
+        print(
+            f"run {index + 1:<3} import={result['import'] * 1000:7.0f}ms startup={result['startup'] * 1000:7.0f}ms "
+            f"shutdown={result['shutdown'] * 1000:5.0f}ms total={total * 1000:7.0f}ms modules={result['modules']}"
+            + (f" worker-only modules loaded: {', '.join(result['worker_only'])}" if result["worker_only"] else "")
+        )
+
+    median = statistics.median(totals)
+    print(f"median import + startup: {median * 1000:.0f}ms, max: {max(totals) * 1000:.0f}ms")
+    if args.budget is not None and median > args.budget:
+        print(f"over budget of {args.budget * 1000:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Measure the per-request cost of the auth dependency (get_current_user).
+
+Compares a cold signature check on every request with the verified-token
+cache, for each available JWT backend.
+
+Usage:
+    python -m benchmarks.auth_dependency --requests 10000
+"""
+import argparse
+import time
+from app.core import security
+from app.core.security import TokenCache, create_access_token, get_current_user
+
+
+def bench(label: str, token: str, requests: int, cache_size: int):
+    security.token_cache = TokenCache(max_size=cache_size)
+    start = time.perf_counter()
+    for _ in range(requests):
+        get_current_user(token)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<16} {elapsed / requests * 1_000_000:8.2f}us/request  ({requests / elapsed:,.0f} req/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10_000, help="Number of simulated requests")
+    args = parser.parse_args()
+
+    token = create_access_token({"id": "benchmark-user", "role": "user"})
+    original_decoder = security.decode_token
+    for backend, build_decoder in security.JWT_DECODERS.items():
+        try:
+            security.decode_token = build_decoder()
+        except RuntimeError as e:
+            print(f"{backend:<16} skipped: {e}")
+            continue
+        bench(f"{backend} (no cache)", token, args.requests, cache_size=0)
+        bench(f"{backend} (cached)", token, args.requests, cache_size=1024)
+    security.decode_token = original_decoder
+
+
+if __name__ == "__main__":
+    main()
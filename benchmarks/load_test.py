@@ -0,0 +1,186 @@
+"""
+Offline end-to-end load test: POST /run-agent -> run_agent_task -> AgentOrchestrator.
+
+Drives the real FastAPI app in-process with httpx at each concurrency level.
+Tasks go through an in-process broker to a pool of worker threads (like
+`celery worker --pool threads`). OpenRouter, DuckDuckGo, WeasyPrint and Redis
+are replaced by the deterministic stand-ins in benchmarks/stubs.py.
+
+Reports submit and end-to-end latency percentiles, tasks/sec and per-stage time
+(auth, DB insert, enqueue, queue wait, agent run, web search, PDF render).
+
+Usage:
+    python -m benchmarks.load_test --concurrency 1,8,32 --tasks 64
+    python -m benchmarks.load_test --model-latency 0.5 --pdf-ratio 0.5 --workers 16
+    python -m benchmarks.load_test --redis-url redis://localhost:6379/15
+"""
+from benchmarks import stubs
+
+import argparse
+import asyncio
+import queue
+import threading
+import time
+import httpx
+from kombu.serialization import dumps, loads
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import CONFIG
+from app.core.security import get_current_user
+from app.main import app
+from app.tasks.celery_app import celery
+from app.tasks.tasks import run_agent_task
+
+stages = stubs.stages
+
+
+class InProcessBroker:
+    """Stands in for the Celery broker and a threaded worker pool."""
+
+    def __init__(self, workers: int):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._finished: dict[str, float] = {}
+        self._waiters: dict[str, tuple[asyncio.AbstractEventLoop, asyncio.Future]] = {}
+        for index in range(workers):
+            threading.Thread(target=self._work, name=f"bench-worker-{index}", daemon=True).start()
+
+    def send_task(self, name, args=None, kwargs=None, task_id=None, **options):
+        start = time.perf_counter()
+        # Round-trip through the configured task serializer, as the real broker would
+        content_type, encoding, body = dumps(args, serializer=celery.conf.task_serializer)
+        self._queue.put((loads(body, content_type, encoding), task_id, time.perf_counter()))
+        stages.add("enqueue", time.perf_counter() - start)
+        return celery.AsyncResult(task_id)
+
+    def _work(self):
+        while True:
+            args, task_id, queued = self._queue.get()
+            stages.add("queue wait", time.perf_counter() - queued)
+            run_agent_task.apply(args=args, task_id=task_id)
+            with self._lock:
+                self._finished[task_id] = time.perf_counter()
+                waiter = self._waiters.pop(task_id, None)
+            if waiter:
+                loop, future = waiter
+                loop.call_soon_threadsafe(future.set_result, self._finished[task_id])
+
+    def wait(self, task_id: str) -> asyncio.Future:
+        """Future resolved with the perf_counter time the task finished."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if task_id in self._finished:
+                future.set_result(self._finished[task_id])
+            else:
+                self._waiters[task_id] = (loop, future)
+        return future
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] if ordered else 0.0
+
+
+def describe(label: str, values: list[float]) -> str:
+    return (
+        f"  {label:<14} n={len(values):<5} "
+        f"p50={percentile(values, 50) * 1000:9.1f}ms "
+        f"p95={percentile(values, 95) * 1000:9.1f}ms "
+        f"p99={percentile(values, 99) * 1000:9.1f}ms"
+    )
+
+
+async def run_level(client: httpx.AsyncClient, broker: InProcessBroker, headers: dict, label: str, concurrency: int, tasks: int, pdf_ratio: float):
+    stages.reset()
+    submit_latencies: list[float] = []
+    end_to_end: list[float] = []
+    task_ids: list[str] = []
+    counter = iter(range(tasks))
+    pdf_every = round(1 / pdf_ratio) if pdf_ratio > 0 else 0
+
+    async def user():
+        for index in counter:
+            legal = pdf_every and index % pdf_every == 0
+            # Distinct across levels too, so the search cache doesn't serve repeat queries
+            prompt = f"{stubs.LEGAL_MARKER if legal else ''} Benchmark task {label}-{index}: summarise the market for widgets"
+            start = time.perf_counter()
+            response = await client.post("/run-agent", json={"prompt": prompt}, headers=headers)
+            submit_latencies.append(time.perf_counter() - start)
+            response.raise_for_status()
+            task_id = response.json()["task_id"]
+            task_ids.append(task_id)
+            finished = await broker.wait(task_id)
+            end_to_end.append(finished - start)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    # Read every outcome back through /tasks/{id}, as a polling client would
+    states = []
+    for task_id in task_ids:
+        response = await client.get(f"/tasks/{task_id}", headers=headers)
+        states.append(response.json()["state"])
+
+    print(
+        f"concurrency={concurrency} tasks={tasks} wall={wall:.2f}s "
+        f"throughput={tasks / wall:.2f} tasks/s succeeded={states.count('SUCCESS')} failed={tasks - states.count('SUCCESS')}"
+    )
+    print(describe("submit", submit_latencies))
+    print(describe("end-to-end", end_to_end))
+    for stage in ("auth", "db insert", "enqueue", "queue wait", "agent run", "web search", "pdf render"):
+        if stage in stages.samples:
+            print(describe(stage, stages.samples[stage]))
+
+
+async def run(args):
+    settings = stubs.StubSettings(
+        model_latency=args.model_latency,
+        output_tokens=args.output_tokens,
+        search_latency=args.search_latency,
+        pdf_latency=args.pdf_latency,
+        real_pdf=args.real_pdf,
+    )
+    stubs.install(settings, redis_url=args.redis_url)
+    CONFIG.AGENT_MAX_CONCURRENCY = args.workers
+
+    broker = InProcessBroker(args.workers)
+    celery.send_task = broker.send_task
+    app.dependency_overrides[get_current_user] = stages.wrap_sync("auth", get_current_user)
+    AsyncSession.commit = stages.wrap_async("db insert", AsyncSession.commit)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            response = await client.post(
+                "/api/v1/auth/login", data={"username": CONFIG.ADMIN_USERNAME, "password": CONFIG.ADMIN_PASSWORD}
+            )
+            response.raise_for_status()
+            headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+            # Warm up: builds the orchestrator and worker loop, opens DB and Redis connections
+            await run_level(client, broker, headers, "warm-up", concurrency=1, tasks=1, pdf_ratio=1)
+            print("-- warm-up done --\n")
+            for concurrency in args.concurrency:
+                await run_level(client, broker, headers, f"c{concurrency}", concurrency, args.tasks, args.pdf_ratio)
+                print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=lambda value: [int(level) for level in value.split(",")], default=[1, 8, 32], help="Comma-separated concurrent clients per level")
+    parser.add_argument("--tasks", type=int, default=64, help="Tasks per concurrency level")
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads (and agent runs sharing the worker loop)")
+    parser.add_argument("--model-latency", type=float, default=0.2, help="Seconds to the first token of every model call")
+    parser.add_argument("--output-tokens", type=int, default=200, help="Tokens in each final answer")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Seconds per web search")
+    parser.add_argument("--pdf-latency", type=float, default=0.5, help="Seconds per stub PDF render")
+    parser.add_argument("--pdf-ratio", type=float, default=0.25, help="Share of tasks that also draft a legal PDF")
+    parser.add_argument("--real-pdf", action="store_true", help="Render PDFs with WeasyPrint instead of the stub")
+    parser.add_argument("--redis-url", default=None, help="Use this Redis instead of fakeredis")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Compare building an AgentOrchestrator per task against the per-process pool.
+
+Only setup cost is measured; no model calls are made.
+
+Usage:
+    python -m benchmarks.orchestrator_pool --tasks 50
+"""
+import argparse
+import statistics
+import time
+from app.agents.manager import AgentOrchestrator
+from app.agents.pool import OrchestratorPool
+
+
+def bench_per_task(tasks: int) -> list[float]:
+    timings = []
+    for _ in range(tasks):
+        start = time.perf_counter()
+        AgentOrchestrator()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def bench_pooled(tasks: int) -> list[float]:
+    pool = OrchestratorPool()
+    timings = []
+    for _ in range(tasks):
+        start = time.perf_counter()
+        pool.get()
+        timings.append(time.perf_counter() - start)
+    pool.close()
+    return timings
+
+
+def report(label: str, timings: list[float]):
+    ordered = sorted(timings)
+    p95 = ordered[max(0, int(len(ordered) * 0.95) - 1)]
+    print(
+        f"{label:<10} total={sum(timings) * 1000:9.2f}ms "
+        f"mean={statistics.mean(timings) * 1000:8.3f}ms "
+        f"p95={p95 * 1000:8.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=50, help="Number of simulated tasks")
+    args = parser.parse_args()
+
+    report("per-task", bench_per_task(args.tasks))
+    report("pooled", bench_pooled(args.tasks))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+"""
+Deterministic stand-ins for the external services an agent task touches.
+
+install() swaps in, for the current process:
+  - a pydantic_ai FunctionModel per agent with fixed latency and output size,
+    scripted to delegate like the real manager (research, or research + legal PDF);
+  - a web_search backend that sleeps and returns canned results;
+  - a PDF render that sleeps and writes a placeholder file (unless real_pdf);
+  - fakeredis, or a real Redis at redis_url, with one async client per event loop.
+
+The SQLite database and rendered files go to a temporary WORK_DIR.
+
+Import this module before anything from `app`: it fills in the settings the app
+requires so the suite runs without a .env file.
+"""
+import asyncio
+import functools
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+
+WORK_DIR = pathlib.Path(tempfile.mkdtemp(prefix="agency-bench-"))
+
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "benchmark")
+os.environ.setdefault("ADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("DB_URL", f"sqlite:///{WORK_DIR / 'bench.db'}")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
+
+from pydantic_ai.messages import ModelResponse, TextPart, ToolCallPart, ToolReturnPart
+from pydantic_ai.models.function import AgentInfo, DeltaToolCall, FunctionModel
+from pydantic_ai.usage import RequestUsage
+
+LEGAL_MARKER = "[legal-pdf]"
+
+
+@dataclass
+class StubSettings:
+    model_latency: float = 0.2
+    output_tokens: int = 200
+    search_latency: float = 0.3
+    pdf_latency: float = 0.5
+    real_pdf: bool = False
+
+
+class StageTimer:
+    """Collects durations per pipeline stage from the API, worker and tool threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples: dict[str, list[float]] = {}
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self.samples = {}
+
+    def wrap_async(self, stage: str, func):
+        @functools.wraps(func)
+        async def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return timed
+
+    def wrap_sync(self, stage: str, func):
+        # wraps() keeps the signature, which FastAPI reads for dependencies
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - start)
+        return timed
+
+
+stages = StageTimer()
+
+
+def _answered(messages) -> bool:
+    return any(isinstance(part, ToolReturnPart) for part in messages[-1].parts)
+
+
+def _prompt(messages) -> str:
+    for message in reversed(messages):
+        for part in message.parts:
+            if part.part_kind == "user-prompt" and isinstance(part.content, str):
+                return part.content
+    return ""
+
+
+def _next_tool_call(messages, info: AgentInfo):
+    """The tool call a well-behaved agent would make next, or None to answer."""
+    if _answered(messages):
+        return None
+    tools = {tool.name for tool in info.function_tools}
+    prompt = _prompt(messages)
+    if "delegate_in_parallel" in tools:
+        tasks = [{"agent": "research", "prompt": prompt}]
+        if LEGAL_MARKER in prompt:
+            tasks.append({"agent": "legal", "prompt": prompt, "legal_mode": "draft", "write_pdf": True})
+        return "delegate_in_parallel", {"tasks": tasks}
+    if "web_search" in tools:
+        return "web_search", {"query": prompt[:80]}
+    if "write_pdf" in tools and "'write_pdf': True" in prompt:
+        return "write_pdf", {
+            "title": "Benchmark Agreement",
+            # Unique per task so the content-addressed store doesn't dedupe every render away
+            "content": f"<h2>Terms</h2><p>{prompt}</p><p>" + "Lorem ipsum dolor sit amet. " * 40 + "</p>",
+            "filename": f"benchmark-{abs(hash(prompt))}.pdf",
+        }
+    return None
+
+
+def stub_model(settings: StubSettings) -> FunctionModel:
+    answer_words = ["token"] * settings.output_tokens
+
+    async def respond(messages, info: AgentInfo) -> ModelResponse:
+        await asyncio.sleep(settings.model_latency)
+        call = _next_tool_call(messages, info)
+        if call:
+            return ModelResponse(parts=[ToolCallPart(call[0], call[1])], usage=RequestUsage(input_tokens=500, output_tokens=30))
+        return ModelResponse(
+            parts=[TextPart(" ".join(answer_words))],
+            usage=RequestUsage(input_tokens=500, output_tokens=settings.output_tokens),
+        )
+
+    async def stream(messages, info: AgentInfo):
+        # Latency is the time to the first chunk, as with a real provider
+        await asyncio.sleep(settings.model_latency)
+        call = _next_tool_call(messages, info)
+        if call:
+            yield {0: DeltaToolCall(name=call[0], json_args=json.dumps(call[1]), tool_call_id=f"call-{time.monotonic_ns()}")}
+            return
+        for start in range(0, len(answer_words), 20):
+            yield " ".join(answer_words[start:start + 20]) + " "
+
+    return FunctionModel(respond, stream_function=stream, model_name="stub")
+
+
+class _StubSearch:
+    def __init__(self, settings: StubSettings):
+        self.settings = settings
+
+    async def function(self, query: str):
+        start = time.perf_counter()
+        await asyncio.sleep(self.settings.search_latency)
+        stages.add("web search", time.perf_counter() - start)
+        return [
+            {"title": f"Result {index} for {query}", "href": f"https://example.com/{index}?q={abs(hash(query))}", "body": "Snippet. " * 20}
+            for index in range(5)
+        ]
+
+
+def _stub_render(settings: StubSettings):
+    def render(title: str, date: str, content: str, pdf_path: str) -> float:
+        time.sleep(settings.pdf_latency)
+        with open(pdf_path, "wb") as f:
+            f.write(b"%PDF-1.4\n% benchmark placeholder\n%%EOF\n")
+        return settings.pdf_latency
+    return render
+
+
+def _install_redis(redis_url):
+    import fakeredis
+    from redis import Redis as SyncRedis
+    from redis.asyncio import Redis
+    from app.core import redis_client
+
+    server = fakeredis.FakeServer() if redis_url is None else None
+    clients = {}
+    lock = threading.Lock()
+
+    def async_client():
+        # redis.asyncio pools belong to one event loop; the API and the worker loop each get their own
+        loop = asyncio.get_running_loop()
+        with lock:
+            if loop not in clients:
+                clients[loop] = (
+                    fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+                    if server else Redis.from_url(redis_url, decode_responses=True)
+                )
+            return clients[loop]
+
+    sync_client = (
+        fakeredis.FakeRedis(server=server, decode_responses=True)
+        if server else SyncRedis.from_url(redis_url, decode_responses=True)
+    )
+
+    # Modules bound the getters at import time, so replace every reference
+    originals = (redis_client.get_async_redis, redis_client.get_sync_redis)
+    for module in list(sys.modules.values()):
+        if getattr(module, "__name__", "").startswith("app"):
+            if getattr(module, "get_async_redis", None) is originals[0]:
+                module.get_async_redis = async_client
+            if getattr(module, "get_sync_redis", None) is originals[1]:
+                module.get_sync_redis = lambda: sync_client
+    return async_client
+
+
+def install(settings: StubSettings, redis_url=None):
+    """Patch the app for an offline run. Returns a factory for the API's async Redis client."""
+    import app.main
+    from app.agents import base
+    from app.agents.metered_model import MeteredModel
+    from app.agents.pool import orchestrator_pool
+    from app.agents.tools import pdf_renderer as renderer_module, pdf_store, search_tool
+    from app.agents.tools.pdf_tool import pdf_renderer
+    from app.core.limiter import limiter
+    from app.tasks import tasks
+
+    def build_model(self, model_name: str):
+        return MeteredModel(stub_model(settings), agent_name=self.name, model_name=model_name)
+
+    base.BaseAgent._build_model = build_model
+    search_tool.get_search_tool = lambda max_results: _StubSearch(settings)
+    if not settings.real_pdf:
+        # Threads see the patched functions; spawned render processes would not
+        pdf_renderer.use_processes = False
+        renderer_module._init_render_worker = lambda: None
+        renderer_module._render_pdf = _stub_render(settings)
+    pdf_renderer.render = stages.wrap_async("pdf render", pdf_renderer.render)
+    pdf_store.blob_path = WORK_DIR / "blobs"
+
+    async_client = _install_redis(redis_url)
+
+    # Quotas and rate limits would cap the load rather than measure it
+    limiter.enabled = False
+    orchestrator_pool.run = stages.wrap_sync("agent run", orchestrator_pool.run)
+    tasks.load_conversation = stages.wrap_sync("worker db", tasks.load_conversation)
+    return async_client
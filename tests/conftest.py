@@ -0,0 +1,13 @@
+import os
+import tempfile
+
+# Settings the app requires, so the tests run without a .env file
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "test")
+os.environ.setdefault("ADMIN_EMAIL", "admin@example.com")
+os.environ.setdefault("DB_URL", f"sqlite:///{tempfile.mkdtemp(prefix='agency-test-')}/test.db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/0")
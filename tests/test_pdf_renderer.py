@@ -0,0 +1,61 @@
+import asyncio
+import os
+from concurrent.futures import Executor, Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.agents.tools import pdf_renderer
+from app.agents.tools.pdf_renderer import PdfRenderer
+
+
+class BrokenPool(Executor):
+    """Stands in for a process pool whose worker died."""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_exception(BrokenProcessPool("a worker process terminated abruptly"))
+        return future
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self.shut_down = True
+
+
+def render(renderer, tmp_path):
+    return asyncio.run(renderer.render("Title", "2026-01-01", "content", str(tmp_path / "out.pdf")))
+
+
+def test_broken_pool_is_replaced(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf_renderer, "_init_render_worker", lambda: None)
+    monkeypatch.setattr(pdf_renderer, "_render_pdf", lambda *args: 0.5)
+
+    renderer = PdfRenderer(use_processes=False)
+    broken = BrokenPool()
+    renderer._executor, renderer._pid = broken, os.getpid()
+
+    with pytest.raises(BrokenProcessPool):
+        render(renderer, tmp_path)
+    assert broken.shut_down
+    assert renderer._executor is None
+    assert renderer._pending == 0
+
+    # The next render builds a fresh pool instead of failing forever
+    assert render(renderer, tmp_path) == 0.5
+    assert renderer._executor is not None and renderer._executor is not broken
+    renderer.shutdown()
+
+
+def test_broken_pool_already_replaced_is_left_alone(monkeypatch):
+    monkeypatch.setattr(pdf_renderer, "_init_render_worker", lambda: None)
+
+    renderer = PdfRenderer(use_processes=False)
+    fresh = renderer._get_executor()
+    stale = BrokenPool()
+
+    renderer._discard(stale)
+    assert not stale.shut_down
+    assert renderer._executor is fresh
+    renderer.shutdown()
@@ -0,0 +1,54 @@
+from uuid import uuid4
+
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import redis_client
+from app.core.database import SessionLocal
+from app.core.limiter import limiter
+from app.core.redis_client import get_sync_redis
+from app.core.security import create_access_token
+from app.enums.task_status import TaskStatus
+from app.main import app
+from app.models.agent_tasks import AgentTask
+from app.tasks.status import task_status_cache
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    """Back the shared REDIS_URL clients with one in-memory server, as API and workers share one Redis."""
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_client, "_redis", fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(redis_client, "_sync_redis", fakeredis.FakeRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(limiter, "enabled", False)
+    return server
+
+
+def test_worker_invalidation_reaches_the_api(redis_server):
+    user_id = str(uuid4())
+    task_id = str(uuid4())
+    token = create_access_token(data={"id": user_id, "role": "user", "tier": "free"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with TestClient(app) as client:
+        assert app.state.redis is redis_client.get_async_redis()
+
+        with SessionLocal() as db:
+            db.add(AgentTask(id=task_id, prompt="hello", user_id=user_id, status=TaskStatus.RUNNING))
+            db.commit()
+
+        response = client.get(f"/tasks/{task_id}", headers=headers)
+        assert response.json()["state"] == "STARTED"
+
+        # What run_agent_task does when the run finishes
+        with SessionLocal() as db:
+            task = db.get(AgentTask, task_id)
+            task.status = TaskStatus.COMPLETED
+            task.result = "done"
+            db.commit()
+        task_status_cache.invalidate(get_sync_redis(), task_id)
+
+        response = client.get(f"/tasks/{task_id}", headers=headers)
+        assert response.json()["state"] == "SUCCESS"
+        assert response.json()["result"] == "done"